@@ -13,6 +13,7 @@ from urllib.urequest import urlopen
 import gc
 import sys
 import json
+import power
 
 
 phosphor = brushes.color(211, 250, 55, 150)
@@ -38,6 +39,9 @@ wlan = None
 connected = False
 ticks_start = None
 
+# the profile hardly changes once loaded, but keep it on show for people to see
+power.request_idle_fps(5)
+
 
 def message(text):
     print(text)
@@ -3,6 +3,8 @@ import os
 
 from badgeware import screen, PixelFont, shapes, brushes, io, run
 import random
+import rects
+import textcache
 
 # GitHub contribution graph colors (dark mode)
 COMMIT_COLORS = [
@@ -14,6 +16,7 @@ COMMIT_COLORS = [
 PADDLE_COLOR = (86, 211, 100)  # #56d364 - bright green
 BALL_COLOR = (163, 113, 247)   # #a371f7 - purple (GitHub purple accent)
 BACKGROUND_COLOR = (13, 17, 23)  # Dark GitHub background
+TEXT_COLOR = (255, 255, 255)
 
 # Game configuration
 SQUARE_SIZE = 6  # Size of each square
@@ -44,6 +47,15 @@ BALL_SPEED = 2
 # Load font
 small_font = PixelFont.load("/system/assets/fonts/nope.ppf")
 
+# Pre-create brushes and rectangle batches (reused every frame)
+COMMIT_BRUSHES = [brushes.color(*color) for color in COMMIT_COLORS]
+paddle_brush = brushes.color(*PADDLE_COLOR)
+brick_rects = rects.buffer(BRICK_COLS * BRICK_ROWS)
+paddle_rects = rects.buffer(PADDLE_SEGMENTS)
+for i in range(PADDLE_SEGMENTS):
+    paddle_rects[i * 4 + 2] = SQUARE_SIZE
+    paddle_rects[i * 4 + 3] = SQUARE_SIZE
+
 class GameState:
     INTRO = 1
     PLAYING = 2
@@ -57,11 +69,6 @@ class Brick:
         self.color = color
         self.alive = True
     
-    def draw(self):
-        if self.alive:
-            screen.brush = brushes.color(*self.color)
-            screen.draw(shapes.rectangle(self.x, self.y, BRICK_WIDTH, BRICK_HEIGHT))
-    
     def get_bounds(self):
         return (self.x, self.y, self.x + BRICK_WIDTH, self.y + BRICK_HEIGHT)
 
@@ -152,10 +159,10 @@ class Paddle:
         return manual_input
     
     def draw(self):
-        screen.brush = brushes.color(*PADDLE_COLOR)
         for i in range(PADDLE_SEGMENTS):
-            x = self.x + (i * UNIT)
-            screen.draw(shapes.rectangle(x, self.y, SQUARE_SIZE, SQUARE_SIZE))
+            paddle_rects[i * 4] = int(self.x) + (i * UNIT)
+            paddle_rects[i * 4 + 1] = self.y
+        rects.fill_rects(paddle_rects, paddle_brush)
     
     def get_bounds(self):
         return (self.x, self.y, self.x + (PADDLE_SEGMENTS * UNIT) - SQUARE_GAP, self.y + SQUARE_SIZE)
@@ -279,6 +286,21 @@ def create_bricks():
             color = random.choice(COMMIT_COLORS)
             bricks.append(Brick(x, y, color))
 
+def draw_bricks():
+    """Fill the alive bricks of each color in a single batch."""
+    for color, brush in zip(COMMIT_COLORS, COMMIT_BRUSHES):
+        count = 0
+        for brick in bricks:
+            if brick.alive and brick.color == color:
+                i = count * 4
+                brick_rects[i] = brick.x
+                brick_rects[i + 1] = brick.y
+                brick_rects[i + 2] = BRICK_WIDTH
+                brick_rects[i + 3] = BRICK_HEIGHT
+                count += 1
+        if count:
+            rects.fill_rects(brick_rects, brush, 0, count)
+
 def update():
     global state, lives, score
     
@@ -302,32 +324,20 @@ def intro():
     screen.font = small_font
     screen.brush = brushes.color(255, 255, 255)
     
-    title = "COMMITS"
-    w, _ = screen.measure_text(title)
-    screen.text(title, 80 - (w // 2), 25)
+    textcache.center("COMMITS", 25, TEXT_COLOR)
     
-    subtitle = "Break the commits!"
-    w, _ = screen.measure_text(subtitle)
-    screen.text(subtitle, 80 - (w // 2), 40)
+    textcache.center("Break the commits!", 40, TEXT_COLOR)
     
     # Controls
-    controls = "A/C: Move"
-    w, _ = screen.measure_text(controls)
-    screen.text(controls, 80 - (w // 2), 55)
+    textcache.center("A/C: Move", 55, TEXT_COLOR)
     
-    controls2 = "B: Launch"
-    w, _ = screen.measure_text(controls2)
-    screen.text(controls2, 80 - (w // 2), 65)
+    textcache.center("B: Launch", 65, TEXT_COLOR)
     
-    controls3 = "DOWN: Auto-play"
-    w, _ = screen.measure_text(controls3)
-    screen.text(controls3, 80 - (w // 2), 75)
+    textcache.center("DOWN: Auto-play", 75, TEXT_COLOR)
     
     # Blink start message
     if int(io.ticks / 500) % 2:
-        msg = "Press B to start"
-        w, _ = screen.measure_text(msg)
-        screen.text(msg, 80 - (w // 2), 90)
+        textcache.center("Press B to start", 90, TEXT_COLOR)
     
     # Draw sample bricks
     for i in range(3):
@@ -388,8 +398,7 @@ def play():
     score = sum(1 for brick in bricks if not brick.alive)
     
     # Draw game objects
-    for brick in bricks:
-        brick.draw()
+    draw_bricks()
     
     paddle.draw()
     ball.draw()
@@ -417,19 +426,13 @@ def game_over():
     screen.font = small_font
     screen.brush = brushes.color(255, 255, 255)
     
-    title = "GAME OVER!"
-    w, _ = screen.measure_text(title)
-    screen.text(title, 80 - (w // 2), 40)
+    textcache.center("GAME OVER!", 40, TEXT_COLOR)
     
-    score_text = f"Commits: {score}"
-    w, _ = screen.measure_text(score_text)
-    screen.text(score_text, 80 - (w // 2), 55)
+    textcache.center(f"Commits: {score}", 55, TEXT_COLOR)
     
     # Blink restart message
     if int(io.ticks / 500) % 2:
-        msg = "Press B to restart"
-        w, _ = screen.measure_text(msg)
-        screen.text(msg, 80 - (w // 2), 75)
+        textcache.center("Press B to restart", 75, TEXT_COLOR)
     
     if io.BUTTON_UP in io.pressed or io.BUTTON_B in io.pressed:
         state = GameState.INTRO
@@ -441,19 +444,13 @@ def win_screen():
     screen.font = small_font
     screen.brush = brushes.color(255, 255, 255)
     
-    title = "YOU WIN!"
-    w, _ = screen.measure_text(title)
-    screen.text(title, 80 - (w // 2), 40)
+    textcache.center("YOU WIN!", 40, TEXT_COLOR)
     
-    score_text = "All commits broken!"
-    w, _ = screen.measure_text(score_text)
-    screen.text(score_text, 80 - (w // 2), 55)
+    textcache.center("All commits broken!", 55, TEXT_COLOR)
     
     # Blink restart message
     if int(io.ticks / 500) % 2:
-        msg = "Press B to restart"
-        w, _ = screen.measure_text(msg)
-        screen.text(msg, 80 - (w // 2), 75)
+        textcache.center("Press B to restart", 75, TEXT_COLOR)
     
     if io.BUTTON_UP in io.pressed or io.BUTTON_B in io.pressed:
         state = GameState.INTRO
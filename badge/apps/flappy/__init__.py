@@ -7,6 +7,7 @@ os.chdir("/system/apps/flappy")
 from badgeware import screen, Image, PixelFont, SpriteSheet, io, brushes, shapes, run
 from mona import Mona
 from obstacle import Obstacle
+import textcache
 
 background = Image.load("assets/background.png")
 grass = Image.load("assets/grass.png")
@@ -158,14 +159,12 @@ def draw_background():
 
 
 def shadow_text(text, x, y):
-    screen.brush = brushes.color(20, 40, 60, 100)
-    screen.text(text, x + 1, y + 1)
-    screen.brush = brushes.color(255, 255, 255)
-    screen.text(text, x, y)
+    textcache.draw(text, x + 1, y + 1, (20, 40, 60, 100))
+    textcache.draw(text, x, y, (255, 255, 255))
 
 
 def center_text(text, y):
-    w, _ = screen.measure_text(text)
+    w, _ = textcache.measure(text)
     shadow_text(text, 80 - (w / 2), y)
 
 
@@ -6,6 +6,8 @@ os.chdir("/system/apps/gallery")
 
 import math
 from badgeware import SpriteSheet, PixelFont, Image, screen, run, io, brushes, shapes
+import power
+from album import Album, THUMBNAIL_SIZE
 
 mona = SpriteSheet("/system/assets/mona-sprites/mona-heart.png", 14, 1).animation()
 screen.font = PixelFont.load("/system/assets/fonts/nope.ppf")
@@ -13,35 +15,20 @@ screen.antialias = Image.X2
 
 ui_hidden = False
 
-# create a dictionary of all the images in the images directory
-files = []
-for file in os.listdir("images"):
-    file = file.rsplit("/", 1)[-1]
-    name, ext = file.rsplit(".", 1)
-    if ext == "png":
-        files.append({
-            "name": file,
-            "title": name.replace("-", " ")
-        })
+# once the ui has hidden the image is static, so slow down and sleep if left
+power.request_idle_fps(2)
+power.allow_sleep()
 
-# load the thumbnail images to match
-thumbnails = []
-for file in files:
-    thumbnails.append(Image.load(f"thumbnails/{file["name"]}"))
-
-# given a gallery image index it clamps it into the range of available images
-
-
-def clamp_index(index):
-    return index % len(files)
+# the album lists the images directory and keeps the thumbnails and images
+# near the cursor in memory
+album = Album("images")
 
 # load the main image based on the gallery index provided
 
 
 def load_image(index):
     global image
-    index = clamp_index(index)
-    image = Image.load(f"images/{files[index]["name"]}")
+    image = album.image(index)
 
 # render the thumbnail strip
 
@@ -58,13 +45,12 @@ def draw_thumbnails():
         pos = (((i + -offset) * spacing) + 60, 92)
 
         # determine which gallery image we're drawing the thumbnail for
-        thumbnail = clamp_index(int(thumbnail_scroll) + i)
-        thumbnail_image = thumbnails[thumbnail]
+        thumbnail_image = album.thumbnail(int(thumbnail_scroll) + i)
+        width, height = THUMBNAIL_SIZE
 
         # draw the thumbnail shadow
         screen.brush = brushes.color(0, 0, 0, 50)
-        screen.draw(shapes.rectangle(
-            pos[0] + 2, pos[1] + 2, thumbnail_image.width, thumbnail_image.height))
+        screen.draw(shapes.rectangle(pos[0] + 2, pos[1] + 2, width, height))
 
         # draw the active thumbnail outline
         if i == 0:
@@ -72,9 +58,11 @@ def draw_thumbnails():
             screen.brush = brushes.color(
                 brightness, brightness, brightness, 150)
             screen.draw(shapes.rectangle(
-                pos[0] - 1, pos[1] - 1, thumbnail_image.width + 2, thumbnail_image.height + 2))
+                pos[0] - 1, pos[1] - 1, width + 2, height + 2))
 
-        screen.blit(thumbnail_image, *pos)
+        # thumbnails that haven't been made yet are left as just the shadow
+        if thumbnail_image:
+            screen.blit(thumbnail_image, *pos)
 
     # draw a jumping mona
     mona_off = abs(((thumbnail_scroll - int(thumbnail_scroll)) * math.pi))
@@ -125,7 +113,10 @@ def update():
     # draw the thumbnail ui
     draw_thumbnails()
 
-    title = files[clamp_index(index)]["title"]
+    # make the next missing thumbnail or decode the next neighbouring image
+    album.update(index, int(thumbnail_scroll))
+
+    title = album.title(index)
     width, _ = screen.measure_text(title)
 
     if not ui_hidden:
@@ -0,0 +1,136 @@
+import os
+from badgeware import Image, file_exists
+
+THUMBNAIL_SIZE = (30, 23)
+THUMBNAIL_CACHE = "/gallery"
+
+# how many thumbnails either side of the cursor to keep in memory, this
+# matches the range of the thumbnail strip
+THUMBNAIL_WINDOW = 3
+
+# how many full images either side of the current one to decode ahead
+PREFETCH_WINDOW = 1
+
+
+# the album keeps only the images near the cursor in memory so the gallery
+# can hold as many images as will fit on the flash
+#
+# thumbnails come from the bundled thumbnails directory if there is one to
+# match the image, otherwise they are generated from the full image the first
+# time they are needed and cached to flash as raw pixel data
+class Album:
+    def __init__(self, path):
+        self.path = path
+        self.files = []
+        self._thumbnails = {}
+        self._images = {}
+
+        for file in sorted(os.listdir(path)):
+            file = file.rsplit("/", 1)[-1]
+            if file.startswith("."):
+                continue
+            name, ext = file.rsplit(".", 1)
+            if ext == "png":
+                self.files.append({
+                    "name": file,
+                    "title": name.replace("-", " ")
+                })
+
+        try:
+            os.mkdir(THUMBNAIL_CACHE)
+        except OSError:
+            pass
+
+    def clamp_index(self, index):
+        return index % len(self.files)
+
+    def title(self, index):
+        return self.files[self.clamp_index(index)]["title"]
+
+    # returns the full image, decoding it now if it wasn't fetched ahead
+    def image(self, index):
+        index = self.clamp_index(index)
+        if index not in self._images:
+            self._images[index] = self._load_image(index)
+        return self._images[index]
+
+    # returns the thumbnail if it is ready, or None if it is still to be made
+    def thumbnail(self, index):
+        return self._thumbnails.get(self.clamp_index(index))
+
+    # called once per frame with the current image and the image at the
+    # centre of the thumbnail strip, drops anything that has moved out of
+    # range and does at most one slow load so the frame rate doesn't stutter
+    def update(self, index, strip_index):
+        index = self.clamp_index(index)
+
+        wanted = self._around(self.clamp_index(strip_index), THUMBNAIL_WINDOW)
+        for i in list(self._thumbnails.keys()):
+            if i not in wanted:
+                del self._thumbnails[i]
+
+        prefetch = self._around(index, PREFETCH_WINDOW)
+        for i in list(self._images.keys()):
+            if i not in prefetch:
+                del self._images[i]
+
+        # thumbnails first as the strip is visibly missing them
+        for i in wanted:
+            if i not in self._thumbnails:
+                self._thumbnails[i] = self._load_thumbnail(i)
+                return
+
+        for i in prefetch:
+            if i not in self._images:
+                self._images[i] = self._load_image(i)
+                return
+
+    # indexes within distance of index, nearest first
+    def _around(self, index, distance):
+        indexes = [index]
+        for offset in range(1, distance + 1):
+            for i in (index - offset, index + offset):
+                i = self.clamp_index(i)
+                if i not in indexes:
+                    indexes.append(i)
+        return indexes
+
+    def _load_image(self, index):
+        return Image.load(f"{self.path}/{self.files[index]['name']}")
+
+    def _load_thumbnail(self, index):
+        name = self.files[index]["name"]
+
+        bundled = f"thumbnails/{name}"
+        if file_exists(bundled):
+            return Image.load(bundled)
+
+        # key the cached copy on the file size so a replaced image gets a new
+        # thumbnail
+        size = os.stat(f"{self.path}/{name}")[6]
+        cached = f"{THUMBNAIL_CACHE}/{name}-{size}.raw"
+
+        thumbnail = Image(0, 0, *THUMBNAIL_SIZE)
+        try:
+            pixels = memoryview(thumbnail)
+        except TypeError:
+            # without access to the pixels there is nothing to cache, so the
+            # thumbnail is rendered from the full image every time
+            pixels = None
+
+        if pixels is not None and file_exists(cached):
+            with open(cached, "rb") as f:
+                f.readinto(pixels)
+            return thumbnail
+
+        # render the full image down to size and store the result
+        thumbnail.scale_blit(self._load_image(index), 0, 0, *THUMBNAIL_SIZE)
+        if pixels is None:
+            return thumbnail
+        try:
+            with open(cached, "wb") as f:
+                f.write(pixels)
+        except OSError as e:
+            print(f"Error caching thumbnail for {name}: {e}")
+
+        return thumbnail
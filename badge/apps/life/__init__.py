@@ -1,5 +1,6 @@
-from badgeware import screen, PixelFont, shapes, brushes, io, run, Matrix
+from badgeware import screen, PixelFont, shapes, brushes, io, run
 import random
+import rects
 
 # GitHub contribution graph colors (dark mode) - based on neighbor count
 NEIGHBOR_COLORS = [
@@ -32,8 +33,10 @@ GRID_HEIGHT = 30  # 120 / 4
 # Load font
 small_font = PixelFont.load("/system/assets/fonts/nope.ppf")
 
-# Pre-create shape for cells (reused for all cells)
-cell_rect = shapes.rectangle(0, 0, SQUARE_SIZE, SQUARE_SIZE)
+# Pre-allocate one batch of cell rectangles, grouped by neighbor color (reused every frame)
+cell_batch = rects.buffer(GRID_WIDTH * GRID_HEIGHT)
+cell_counts = [0] * len(NEIGHBOR_BRUSHES)
+cell_offsets = [0] * len(NEIGHBOR_BRUSHES)
 
 # Interesting Life patterns (name, pattern as list of (x, y) offsets)
 PATTERNS = {
@@ -202,16 +205,38 @@ class GameOfLife:
     
     def draw(self):
         """Draw the grid with colors based on neighbor count"""
-        # Use pre-created shape and brushes for performance
+        # Group alive cells by color so each color is filled in one batch,
+        # first count the cells of each color to find where each group starts
+        for i in range(len(cell_counts)):
+            cell_counts[i] = 0
+        for y in range(GRID_HEIGHT):
+            for x in range(GRID_WIDTH):
+                if self.grid[y][x]:
+                    cell_counts[self.neighbor_counts[y][x]] += 1
+
+        offset = 0
+        for i in range(len(cell_counts)):
+            cell_offsets[i] = offset
+            offset += cell_counts[i]
+
         for y in range(GRID_HEIGHT):
             py = y * GRID_SIZE
             for x in range(GRID_WIDTH):
                 if self.grid[y][x]:
                     # Alive cells - color based on neighbor count
                     neighbors = self.neighbor_counts[y][x]
-                    screen.brush = NEIGHBOR_BRUSHES[neighbors]
-                    cell_rect.transform = Matrix().translate(x * GRID_SIZE, py)
-                    screen.draw(cell_rect)
+                    i = cell_offsets[neighbors] * 4
+                    cell_batch[i] = x * GRID_SIZE
+                    cell_batch[i + 1] = py
+                    cell_batch[i + 2] = SQUARE_SIZE
+                    cell_batch[i + 3] = SQUARE_SIZE
+                    cell_offsets[neighbors] += 1
+
+        start = 0
+        for neighbors, count in enumerate(cell_counts):
+            if count:
+                rects.fill_rects(cell_batch, NEIGHBOR_BRUSHES[neighbors], start, count)
+                start += count
 
 # Game state
 game = GameOfLife()
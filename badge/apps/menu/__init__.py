@@ -5,11 +5,11 @@ sys.path.insert(0, "/system/apps/menu")
 os.chdir("/system/apps/menu")
 
 import math
-from badgeware import screen, PixelFont, Image, SpriteSheet, is_dir, file_exists, shapes, brushes, io, run
+import textcache
+from badgeware import screen, PixelFont, Image, is_dir, file_exists, shapes, brushes, io, run
 from icon import Icon
 import ui
 
-mona = SpriteSheet("/system/assets/mona-sprites/mona-default.png", 11, 1)
 screen.font = PixelFont.load("/system/assets/fonts/ark.ppf")
 # screen.antialias = Image.X2
 
@@ -125,18 +125,16 @@ def update():
     # draw label for active menu icon
     if Icon.active_icon:
         label = f"{Icon.active_icon.name}"
-        w, _ = screen.measure_text(label)
+        w, _ = textcache.measure(label)
         screen.brush = brushes.color(211, 250, 55)
         screen.draw(shapes.rounded_rectangle(80 - (w / 2) - 4, 100, w + 8, 15, 4))
-        screen.brush = brushes.color(0, 0, 0, 150)
-        screen.text(label, 80 - (w / 2), 101)
+        textcache.draw(label, 80 - (w / 2), 101, (0, 0, 0, 150))
     
     # draw page indicator if multiple pages
     if total_pages > 1:
         page_label = f"{current_page + 1}/{total_pages}"
-        w, _ = screen.measure_text(page_label)
-        screen.brush = brushes.color(211, 250, 55, 150)
-        screen.text(page_label, 160 - w - 5, 112)
+        w, _ = textcache.measure(page_label)
+        textcache.draw(page_label, 160 - w - 5, 112, (211, 250, 55, 150))
 
     if alpha <= MAX_ALPHA:
         screen.brush = brushes.color(0, 0, 0, 255 - alpha)
@@ -1,6 +1,8 @@
 import math
 import random
-from badgeware import brushes, shapes, io, screen, Matrix, get_battery_level, is_charging
+import rects
+from array import array
+from badgeware import brushes, shapes, io, screen, get_battery_level, is_charging
 
 black = brushes.color(0, 0, 0)
 background = brushes.color(35, 41, 37)
@@ -8,15 +10,13 @@ phosphor = brushes.color(211, 250, 55)
 terminal_text = brushes.color(60, 71, 16)
 terminal_fade = brushes.color(35, 41, 37, 150)
 
+corners = array("h", [0, 0, 10, 10, 150, 0, 10, 10, 0, 110, 10, 10, 150, 110, 10, 10])
+
 
 def draw_background():
     # draw over the corners in black ready for the rounded rectangle that makes
     # up most of the background
-    screen.brush = black
-    screen.draw(shapes.rectangle(0, 0, 10, 10))
-    screen.draw(shapes.rectangle(150, 0, 10, 10))
-    screen.draw(shapes.rectangle(0, 110, 10, 10))
-    screen.draw(shapes.rectangle(150, 110, 10, 10))
+    rects.fill_rects(corners, black)
 
     # draw the faux crt shape background area
     screen.brush = background
@@ -49,17 +49,18 @@ class Terminal:
 for _ in range(25):
     Terminal.add_line()
 
+# room for every word on screen, at most 21 lines of up to 20 words each
+terminal_words = rects.buffer(21 * 20)
+
 
 # the terminal effect creates a rolling window of text that is infinitely
 # populated with new lines
 def draw_terminal():
-    screen.brush = terminal_text
-
     # update the fake terminal
     Terminal.update()
 
-    # draw the terminal lines
-    rect = shapes.rectangle(0, 0, 1, 1)
+    # gather the terminal lines into one batch of words
+    count = 0
     for i in range(21):
         # work out the position of screen that this line will be rendered
         y = 20 + i * 5
@@ -73,12 +74,18 @@ def draw_terminal():
         while cx < Terminal.lines[i]:
             # pick a random word width
             w = random.randint(3, 10)
-            # draw the "greeked" word
-            rect.transform = Matrix().translate(cx + 5, y).scale(w, 2)
-            screen.draw(rect)
+            # add the "greeked" word
+            j = count * 4
+            terminal_words[j] = cx + 5
+            terminal_words[j + 1] = y
+            terminal_words[j + 2] = w
+            terminal_words[j + 3] = 2
+            count += 1
             # add a space
             cx += w + 2
 
+    rects.fill_rects(terminal_words, terminal_text, 0, count)
+
     # draw the terminal fade at top
     screen.brush = terminal_fade
     screen.draw(shapes.rectangle(0, 15, 160, 5))
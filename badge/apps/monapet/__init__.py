@@ -5,47 +5,68 @@ sys.path.insert(0, "/system/apps/monapet")
 os.chdir("/system/apps/monapet")
 
 
+import time
 import ui
 from mona import Mona
-from badgeware import io, run, State
+from badgeware import io, run
+from store import State
+import power
 
 mona = Mona(82)  # create mona!
 
+# mona's stats keep falling while the badge sleeps, so let it sleep when
+# nobody is looking
+power.request_idle_fps(10)
+power.allow_sleep()
+
 # speed at which each statistic goes from 100% to 0%
 happiness_duration = 1800
 hunger_duration = 1200
 cleanliness_duration = 2400
 
 
+# reduce mona's stats by however much they fall over the given number of
+# seconds, stats fall linearly so this works for a single frame or for hours
+def decay(seconds):
+    happy_delta = (seconds / happiness_duration) * 100
+    mona.happy(-happy_delta)
+    hunger_delta = (seconds / hunger_duration) * 100
+    mona.hunger(-hunger_delta)
+    clean_delta = (seconds / cleanliness_duration) * 100
+    mona.clean(-clean_delta)
+
+
+# save mona's stats along with the wall clock time they were saved at
+def save_state():
+    state = mona.save()
+    state["saved_at"] = time.time()
+    State.save("monapet", state)
+
+
 def game_update():
     global mona
 
     if not mona.is_dead():
         # calculate mona's new stats based on the time since last update
-        seconds = io.ticks_delta / 1000
-
-        # work out how much mona's stats have reduce since the last frame
-        happy_delta = (seconds / happiness_duration) * 100
-        mona.happy(-happy_delta)
-        hunger_delta = (seconds / hunger_duration) * 100
-        mona.hunger(-hunger_delta)
-        clean_delta = (seconds / cleanliness_duration) * 100
-        mona.clean(-clean_delta)
+        decay(io.ticks_delta / 1000)
 
         # play with mona!
         if io.BUTTON_A in io.pressed:
             mona.happy(30)
             mona.do_action("heart")
+            save_state()
 
         # feed mona!
         if io.BUTTON_B in io.pressed:
             mona.hunger(30)
             mona.do_action("eating")
+            save_state()
 
         # clean mona!
         if io.BUTTON_C in io.pressed:
             mona.clean(30)
             mona.do_action("dance")
+            save_state()
 
         # every five seconds mona will move to a new location
         if mona.time_since_last_position_change() > 5:
@@ -66,6 +87,7 @@ def game_update():
         # if user pressed button b then reset mona's stats
         if io.BUTTON_B in io.pressed:
             mona = Mona(82)
+            save_state()
 
 
 def update():
@@ -105,11 +127,17 @@ def init():
     if State.load("monapet", state):
         mona.load(state)
 
+        # catch mona up on the time that passed while the app wasn't running,
+        # a negative time means the clock was reset so there's nothing to do
+        elapsed = time.time() - state.get("saved_at", time.time())
+        if elapsed > 0:
+            decay(elapsed)
+
     del state
 
 
 def on_exit():
-    State.save("monapet", mona.save())
+    save_state()
 
 
 if __name__ == "__main__":
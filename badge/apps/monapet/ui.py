@@ -1,4 +1,6 @@
 import math
+import rects
+import textcache
 from badgeware import screen, brushes, SpriteSheet, shapes, PixelFont, io
 
 # load user interface sprites
@@ -27,6 +29,10 @@ stats_icons = {
 outline_brush = brushes.color(20, 30, 40, 150)
 outline_brush_bold = brushes.color(20, 30, 40, 200)
 
+# the checkered wallpaper is 76 squares, refilled and drawn as one batch
+wallpaper_brush = brushes.color(30, 40, 20)
+wallpaper = rects.buffer(76)
+
 # draw the background scenery
 def background(mona):
     floor_y, mona_x = mona.position()[1] - 5, mona.position()[0]
@@ -36,15 +42,19 @@ def background(mona):
     screen.draw(shapes.rectangle(0, 0, 160, floor_y))
 
     # animate the wallpaper
-    screen.brush = brushes.color(30, 40, 20)
     mx = (mona_x - 80) / 2
+    xo = round(math.sin(io.ticks / 1000) * 2)
+    yo = round(math.cos(io.ticks / 1000) * 2)
+    i = 0
     for y in range(8):
         for x in range(19):
             if (x + y) % 2 == 0:
-                xo = math.sin(io.ticks / 1000) * 2
-                yo = math.cos(io.ticks / 1000) * 2
-                screen.draw(shapes.rectangle(
-                    x * 10 - mx, y * 10 - 3, xo + 4, yo + 4))
+                wallpaper[i] = round(x * 10 - mx)
+                wallpaper[i + 1] = y * 10 - 3
+                wallpaper[i + 2] = xo + 4
+                wallpaper[i + 3] = yo + 4
+                i += 4
+    rects.fill_rects(wallpaper, wallpaper_brush)
 
     # draw the picture frame
     px = 140 - mx
@@ -90,8 +100,7 @@ def draw_header():
     screen.brush = outline_brush
     screen.draw(shapes.rounded_rectangle(40, -5, 160 - 80, 18, 3))
 
-    screen.brush = brushes.color(255, 255, 255)
-    center_text("mona pet", 0)
+    textcache.center("mona pet", 0, (255, 255, 255))
 
 # draw a user action button with button name and label
 
@@ -103,8 +112,7 @@ def draw_button(x, y, label, active):
     bounce = math.sin(((io.ticks / 20) - x) / 10) * 2
 
     # draw the button label
-    screen.brush = brushes.color(255, 255, 255, 255 if active else 150)
-    shadow_text(label, y + (bounce / 2), x, x + width)
+    shadow_text(label, y + (bounce / 2), (255, 255, 255, 255 if active else 150), x, x + width)
 
     # draw the button arrow
     arrows.sprite(2, 0).alpha = 255 if active else 150
@@ -139,14 +147,6 @@ def draw_bar(name, x, y, amount):
     screen.blit(stats_icons[name], x, y)
 
 
-def center_text(text, y, sx=0, ex=160):
-    w, _ = screen.measure_text(text)
-    screen.text(text, sx + ((ex - sx) / 2) - (w / 2), y)
-
-
-def shadow_text(text, y, sx=0, ex=160):
-    temp = screen.brush
-    screen.brush = brushes.color(0, 0, 0, 100)
-    center_text(text, y + 1, sx + 1, ex + 1)
-    screen.brush = temp
-    center_text(text, y, sx, ex)
+def shadow_text(text, y, colour, sx=0, ex=160):
+    textcache.center(text, y + 1, (0, 0, 0, 100), sx + 1, ex + 1)
+    textcache.center(text, y, colour, sx, ex)
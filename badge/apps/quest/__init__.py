@@ -6,16 +6,18 @@ os.chdir("/system/apps/quest")
 
 import math
 import random
-from badgeware import State, PixelFont, Image, brushes, screen, io, shapes, run
+from badgeware import brushes, screen, io, shapes, run
 from beacon import GithubUniverseBeacon
 from aye_arr.nec import NECReceiver
+from store import State
+import assets
 import ui
 
 
 
-small_font = PixelFont.load("/system/assets/fonts/ark.ppf")
-large_font = PixelFont.load("/system/assets/fonts/absolute.ppf")
-splash = Image.load("assets/splash.png")
+small_font = assets.font("/system/assets/fonts/ark.ppf")
+large_font = assets.font("/system/assets/fonts/absolute.ppf")
+splash = assets.image("assets/splash.png")
 
 class Quest:
   def __init__(self, id, code, name):
@@ -35,11 +37,6 @@ quests = [
   Quest(9, 0x99, "Makerspace")
 ]
 
-# setup handled ir button codes
-for quest in quests:
-  GithubUniverseBeacon.BUTTON_CODES[quest.id] = quest.code
-
-
 state = {
   "completed": []
 }
@@ -49,6 +46,20 @@ State.load("quest", state)
 
 _last_task_completed = None
 _last_task_completed_at = None
+
+# the signal meter shows the share of ir sequences decoded over the last
+# second, and the receiver's counters are saved once a minute when they
+# change, so missed quests can be diagnosed later
+SIGNAL_SAMPLE_MS = 1000
+COUNTERS_SAVE_MS = 60000
+
+show_signal = False
+signal_bars = 0
+_signal_sampled_at = 0
+_signal_frames = 0
+_signal_failed = 0
+_counters_saved_at = 0
+_counters_saved_frames = 0
 def complete_quest(id):
   global _last_task_completed_at, _last_task_completed
   if id not in state["completed"] and id <= len(quests):
@@ -57,19 +68,55 @@ def complete_quest(id):
     state["completed"].append(id)
     State.save("quest", state)
 
-# setup the ir receiver to callback to our complete quest method when a code
-# is received...
+# setup the beacon remote with a code for each quest
 ir = GithubUniverseBeacon()
-ir.on_known = complete_quest
+
+# setup handled ir button codes
+for quest in quests:
+  ir.add_code(quest.id, quest.code)
+
+# decode ir codes from the receiver's interrupt as soon as they arrive, rather
+# than once per frame, and pick them up as events in update()
 receiver = NECReceiver(21, 0, 0)    # Pin, PIO, SM
 receiver.bind(ir)
-receiver.start()
+receiver.start(scheduled=True)
+
+def sample_signal():
+  global signal_bars, _signal_sampled_at, _signal_frames, _signal_failed
+  global _counters_saved_at, _counters_saved_frames
+
+  if io.ticks - _signal_sampled_at < SIGNAL_SAMPLE_MS:
+    return
+  _signal_sampled_at = io.ticks
+
+  counters = receiver.counters()
+  frames = counters["frames"] - _signal_frames
+  failed = counters["failed"] - _signal_failed
+  _signal_frames = counters["frames"]
+  _signal_failed = counters["failed"]
+
+  # light a bar for each quarter of the sequences that decoded
+  signal_bars = (frames - failed) * 4 // frames if frames > 0 else 0
+
+  if io.ticks - _counters_saved_at >= COUNTERS_SAVE_MS and counters["frames"] != _counters_saved_frames:
+    _counters_saved_at = io.ticks
+    _counters_saved_frames = counters["frames"]
+    State.save("quest_ir", counters)
 
 def update():
-  global _last_task_completed_at
+  global _last_task_completed_at, show_signal
+
+  # complete the quest of any beacon codes received since the last frame
+  for _, addr, cmd in receiver.events():
+    id = ir.name(cmd) if addr == ir.ADDRESS else None
+    if id is not None:
+      complete_quest(id)
+
+  sample_signal()
 
-  # decode any ir events that have occurred
-  receiver.decode()
+  # toggle the signal meter with B, unless dismissing a quest completed screen
+  if io.BUTTON_B in io.pressed and not _last_task_completed_at:
+    show_signal = not show_signal
 
   # clear the screen
   screen.brush = brushes.color(35, 41, 37)
@@ -78,6 +125,8 @@ def update():
   # draw the quest tile grid
   ui.draw_status(state["completed"])
   ui.draw_tiles(state["completed"])
+  if show_signal:
+    ui.draw_signal(signal_bars)
 
   # if button pressed and we're showing a quest completed screen then dismiss it
   if io.pressed and _last_task_completed_at:
@@ -1,11 +1,12 @@
 import math
 from badgeware import *
+import assets
 
 screen.antialias = Image.X2
 
-mona = Image.load("assets/mona.png")
-large_font = PixelFont.load("/system/assets/fonts/ignore.ppf")
-small_font = PixelFont.load("/system/assets/fonts/ark.ppf")
+mona = assets.image("assets/mona.png")
+large_font = assets.font("/system/assets/fonts/ignore.ppf")
+small_font = assets.font("/system/assets/fonts/ark.ppf")
 
 tile_colors = [
   None,
@@ -33,6 +34,18 @@ def draw_status(complete):
   screen.text("found", 7, 30)
 
 
+def draw_signal(bars):
+  # draw a meter of four rising bars below the found count, lighting the
+  # first `bars` of them
+  for i in range(4):
+    height = 3 + i * 2
+    if i < bars:
+      screen.brush = brushes.color(86, 211, 100)
+    else:
+      screen.brush = brushes.color(50, 60, 70)
+    screen.draw(shapes.rectangle(7 + i * 4, 54 - height, 3, height))
+
+
 def draw_tiles(complete):
   # define tile shape and set position of tile grid
   tile = shapes.squircle(0, 0, 1, 6)
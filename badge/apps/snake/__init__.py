@@ -3,6 +3,7 @@ import os
 
 from badgeware import screen, PixelFont, shapes, brushes, io, run
 import random
+import rects
 
 # GitHub contribution graph colors (dark mode)
 COMMIT_COLORS = [
@@ -23,6 +24,10 @@ GRID_HEIGHT = 30  # 120 / 4
 # Load font
 small_font = PixelFont.load("/system/assets/fonts/nope.ppf")
 
+# Pre-create brush and segment batch (the snake can at most fill the grid)
+snake_brush = brushes.color(*SNAKE_COLOR)
+segment_rects = rects.buffer(GRID_WIDTH * GRID_HEIGHT)
+
 class GameState:
     INTRO = 1
     PLAYING = 2
@@ -74,9 +79,14 @@ class Snake:
         self.grow_pending += 1
     
     def draw(self):
-        screen.brush = brushes.color(*SNAKE_COLOR)
+        i = 0
         for x, y in self.segments:
-            screen.draw(shapes.rectangle(x * GRID_SIZE, y * GRID_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+            segment_rects[i] = x * GRID_SIZE
+            segment_rects[i + 1] = y * GRID_SIZE
+            segment_rects[i + 2] = SQUARE_SIZE
+            segment_rects[i + 3] = SQUARE_SIZE
+            i += 4
+        rects.fill_rects(segment_rects, snake_brush, 0, len(self.segments))
 
 class Commit:
     def __init__(self):
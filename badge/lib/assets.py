@@ -0,0 +1,55 @@
+# shared loader for read-only fonts, images and sprite sheets
+#
+# everything loaded with PixelFont.load, Image.load or SpriteSheet is decoded
+# into the heap, and apps often load the same file from more than one module
+# (quest's __init__ and ui both load ark.ppf). loading through here hands back
+# the copy that is already in memory instead of decoding another one.
+#
+#   import assets
+#
+#   small_font = assets.font("/system/assets/fonts/ark.ppf")
+#   splash = assets.image("assets/splash.png")
+#   mona = assets.sprite_sheet("/system/assets/mona-sprites/mona-dead.png", 7, 1)
+#
+# images handed out are shared, so don't draw onto them and remember that
+# changing alpha affects every user. use Image() to create a surface to draw
+# on instead.
+
+import os
+from badgeware import PixelFont, Image, SpriteSheet
+
+_cache = {}
+
+
+def _absolute(path):
+    # relative paths are relative to the app directory, which is the current
+    # directory while an app is running
+    return path if path.startswith("/") else f"{os.getcwd()}/{path}"
+
+
+def font(path):
+    key = ("font", _absolute(path))
+    if key not in _cache:
+        _cache[key] = PixelFont.load(path)
+    return _cache[key]
+
+
+def image(path):
+    key = ("image", _absolute(path))
+    if key not in _cache:
+        _cache[key] = Image.load(path)
+    return _cache[key]
+
+
+def sprite_sheet(path, columns, rows):
+    key = ("sprite_sheet", _absolute(path), columns, rows)
+    if key not in _cache:
+        _cache[key] = SpriteSheet(path, columns, rows)
+    return _cache[key]
+
+
+# forget everything loaded so far, the assets are freed once nothing else is
+# holding on to them. main.py calls this once the launcher exits, so an app
+# starts without the launcher's assets
+def release():
+    _cache.clear()
@@ -0,0 +1,57 @@
+# frame loop for apps launched from the menu that only pushes changed frames
+#
+# badgeware's run() pixel doubles the framebuffer out to the display every
+# frame, even when the app drew exactly the same thing as last time. this
+# loop hashes the framebuffer after each update() and skips the push when it
+# hasn't changed.
+#
+# while the screen stays static and no buttons are being pressed the loop
+# also backs off, polling less and less often up to MAX_BACKOFF_MS between
+# frames. any input or change on screen returns it to full speed.
+
+import time
+from badgeware import io, screen, display
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+MIN_BACKOFF_MS = 5
+MAX_BACKOFF_MS = 30      # kept under the shortest button tap, so polling never misses one
+
+
+def _framebuffer():
+    try:
+        return memoryview(screen)
+    except TypeError:
+        return None
+
+
+def run(update):
+    framebuffer = _framebuffer() if crc32 else None
+    last_hash = None
+    backoff = 0
+
+    while True:
+        io.poll()
+
+        result = update()
+        if result is not None:
+            return result
+
+        # without access to the framebuffer every frame counts as changed
+        changed = True
+        if framebuffer is not None:
+            frame_hash = crc32(framebuffer)
+            changed = frame_hash != last_hash
+            last_hash = frame_hash
+
+        if changed:
+            display.update()
+
+        if changed or io.held or io.pressed:
+            backoff = 0
+        else:
+            backoff = min(max(backoff * 2, MIN_BACKOFF_MS), MAX_BACKOFF_MS)
+            time.sleep_ms(backoff)
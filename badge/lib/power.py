@@ -0,0 +1,126 @@
+# power management for apps launched from the menu
+#
+# main.py calls power.tick() after every frame. while the buttons are in use
+# nothing changes, but once input has been idle for a while:
+#
+# - the display backlight is dimmed, where the display has one
+# - apps that asked for it with request_idle_fps(n) drop to n frames per second
+# - apps that opted in with allow_sleep() put the badge into light sleep,
+#   waking up again when any front button is pressed
+#
+# pressing a button restores full brightness and frame rate straight away.
+#
+#   import power
+#
+#   power.request_idle_fps(5)   # nothing here needs to animate smoothly
+#   power.allow_sleep()         # and it's fine to stop completely
+
+import time
+import machine
+from badgeware import io, display, is_charging
+from store import State
+
+IDLE_TIMEOUT_MS = 15000     # dim and slow down after this long without input
+SLEEP_TIMEOUT_MS = 120000   # sleep after this long, if the app allows it
+
+ACTIVE_BACKLIGHT = 1.0
+IDLE_BACKLIGHT = 0.3
+
+WAKE_BUTTONS = ("BUTTON_A", "BUTTON_B", "BUTTON_C", "BUTTON_UP", "BUTTON_DOWN")
+
+_idle_fps = None
+_sleep_allowed = False
+_input_at = time.ticks_ms()
+_frame_at = time.ticks_ms()
+_idle = False
+
+
+def _backlight(level):
+    # backlight() isn't part of the documented badgeware api, so carry on
+    # without dimming if this display doesn't have it
+    if not hasattr(display, "backlight"):
+        return
+    try:
+        display.backlight(level)
+    except (TypeError, ValueError):
+        pass
+
+
+def request_idle_fps(fps):
+    global _idle_fps
+    _idle_fps = fps
+
+
+def allow_sleep(allowed=True):
+    global _sleep_allowed
+    _sleep_allowed = allowed
+
+
+def is_idle():
+    return _idle
+
+
+def tick():
+    global _input_at, _frame_at, _idle
+
+    now = time.ticks_ms()
+
+    if io.held or io.pressed:
+        _input_at = now
+        if _idle:
+            _idle = False
+            _backlight(ACTIVE_BACKLIGHT)
+
+    idle_for = time.ticks_diff(now, _input_at)
+
+    if not _idle and idle_for > IDLE_TIMEOUT_MS:
+        _idle = True
+        _backlight(IDLE_BACKLIGHT)
+
+    if _idle:
+        # no point saving power while plugged in
+        if _sleep_allowed and idle_for > SLEEP_TIMEOUT_MS and not is_charging():
+            _sleep()
+            now = time.ticks_ms()
+
+        # hold the frame back until the requested frame time has passed
+        elif _idle_fps:
+            wait = (1000 // _idle_fps) - time.ticks_diff(now, _frame_at)
+            if wait > 0:
+                time.sleep_ms(wait)
+                now = time.ticks_ms()
+
+    _frame_at = now
+
+
+def _sleep():
+    global _input_at, _idle
+
+    # nothing runs while asleep so write out any pending state first
+    State.flush()
+    _backlight(0)
+
+    # any front button wakes us up again (HOME already has its own irq)
+    pins = [getattr(machine.Pin.board, name) for name in WAKE_BUTTONS]
+    for pin in pins:
+        pin.irq(trigger=machine.Pin.IRQ_FALLING, handler=_wake)
+
+    machine.lightsleep()
+
+    for pin in pins:
+        pin.irq(handler=None)
+
+    # don't pass the wake up press into the app
+    io.poll()
+    while io.held:
+        io.poll()
+
+    _input_at = time.ticks_ms()
+    _idle = False
+    _backlight(ACTIVE_BACKLIGHT)
+
+
+def _wake(pin):
+    # nothing to do here, but the pin irq is only enabled while it has a
+    # handler, and the interrupt it raises is what ends machine.lightsleep()
+    pass
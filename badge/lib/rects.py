@@ -0,0 +1,57 @@
+# batched axis-aligned rectangle fills
+#
+# screen.draw(shapes.rectangle(...)) builds a shape and pushes it through the
+# vector rasteriser with antialiasing, which is a lot of work for a block of
+# solid colour. fill_rects() takes a whole batch of rectangles packed into a
+# flat array of x, y, w, h values and fills each one by clearing a window onto
+# the image, skipping the rasteriser entirely.
+#
+#   from array import array
+#   import rects
+#
+#   cells = array("h", [0, 0, 3, 3, 4, 0, 3, 3])
+#   rects.fill_rects(cells, brushes.color(86, 211, 100))
+#
+# pass start and count to draw only part of a preallocated array, so batches
+# can be rebuilt every frame without allocating a new array. each rectangle
+# still allocates the small window image it is cleared through, so this saves
+# the rasteriser's work rather than the heap's. coordinates are whole pixels,
+# so use this for grids and blocks rather than anything that moves by
+# fractions of a pixel.
+
+from array import array
+from badgeware import screen
+
+
+# make an array able to hold count rectangles
+def buffer(count):
+    return array("h", bytes(count * 8))
+
+
+def fill_rects(rects, brush, start=0, count=None, image=screen):
+    if count is None:
+        count = len(rects) // 4 - start
+
+    width, height = image.width, image.height
+    i = start * 4
+    for _ in range(count):
+        x, y, w, h = rects[i], rects[i + 1], rects[i + 2], rects[i + 3]
+        i += 4
+
+        # clip to the image, windows can't reach outside it
+        if x < 0:
+            w += x
+            x = 0
+        if y < 0:
+            h += y
+            y = 0
+        if x + w > width:
+            w = width - x
+        if y + h > height:
+            h = height - y
+        if w <= 0 or h <= 0:
+            continue
+
+        window = image.window(x, y, w, h)
+        window.brush = brush
+        window.clear()
@@ -0,0 +1,136 @@
+# app state storage that batches saves in ram and writes them to an
+# append-only journal on the LittleFS partition
+#
+# it is a drop-in replacement for badgeware's State:
+#
+#   from store import State
+#
+#   State.load("myapp", state)   # merge saved values into the defaults dict
+#   State.save("myapp", state)   # cheap, just marks "myapp" as dirty
+#
+# dirty keys are written out by State.tick() (called every frame by main.py)
+# once input has gone idle or they have been waiting too long, and by
+# State.flush() on the HOME button path before the badge resets.
+#
+# every flush appends one json line per dirty key, so a save is a small
+# sequential write. a power loss mid-write can only leave a torn line at the
+# end of the journal, which is skipped on the next read and removed by
+# compacting. compaction writes the latest value of every key to a new file
+# and renames it over the journal, so the old journal stays intact until the
+# new one is complete.
+
+import os
+import json
+import time
+from badgeware import State as FirmwareState, io
+
+JOURNAL_PATH = "/state.journal"
+COMPACT_PATH = "/state.journal.tmp"
+
+FLUSH_IDLE_MS = 1000        # flush once input has been idle for this long
+FLUSH_MAX_DELAY_MS = 10000  # never hold a dirty key for longer than this
+COMPACT_STALE_LINES = 32    # compact once this many superseded lines build up
+
+
+class State:
+    _lines = None       # key -> journal line holding its latest saved value
+    _journal_lines = 0  # lines in the journal file, including superseded ones
+    _dirty = {}         # key -> state dict waiting to be written
+    _dirty_at = None
+    _input_at = 0
+
+    def load(key, state):
+        State._read()
+
+        if key in State._dirty:
+            saved = State._dirty[key]
+        elif key in State._lines:
+            saved = json.loads(State._lines[key])[1]
+        else:
+            # nothing journalled yet, pick up anything the firmware saved
+            return FirmwareState.load(key, state)
+
+        state.update(saved)
+        return True
+
+    def save(key, state):
+        if State._dirty_at is None:
+            State._dirty_at = time.ticks_ms()
+        State._dirty[key] = state
+
+    def tick():
+        now = time.ticks_ms()
+        if io.held or io.pressed:
+            State._input_at = now
+
+        if not State._dirty:
+            return
+
+        # prefer to write while nobody is pressing buttons, but don't let
+        # a busy app hold changes in ram indefinitely
+        if time.ticks_diff(now, State._input_at) > FLUSH_IDLE_MS or \
+           time.ticks_diff(now, State._dirty_at) > FLUSH_MAX_DELAY_MS:
+            State.flush()
+
+    def flush():
+        if not State._dirty:
+            return
+
+        State._read()
+
+        try:
+            with open(JOURNAL_PATH, "a") as f:
+                for key, state in State._dirty.items():
+                    line = json.dumps([key, state]) + "\n"
+                    f.write(line)
+                    State._lines[key] = line
+                    State._journal_lines += 1
+        except OSError as e:
+            print(f"Error writing state journal: {e}")
+            return
+
+        State._dirty = {}
+        State._dirty_at = None
+
+        if State._journal_lines - len(State._lines) >= COMPACT_STALE_LINES:
+            State._compact()
+
+    def _read():
+        if State._lines is not None:
+            return
+
+        State._lines = {}
+        State._journal_lines = 0
+        torn = False
+
+        try:
+            with open(JOURNAL_PATH, "r") as f:
+                for line in f:
+                    State._journal_lines += 1
+                    try:
+                        # a line without its newline was cut off mid-write
+                        if not line.endswith("\n"):
+                            raise ValueError
+                        key, _ = json.loads(line)
+                    except (ValueError, TypeError):
+                        torn = True
+                        continue
+                    State._lines[key] = line
+        except OSError:
+            pass
+
+        # rewrite the journal so new lines aren't appended to a torn one
+        if torn:
+            State._compact()
+
+    def _compact():
+        try:
+            with open(COMPACT_PATH, "w") as f:
+                for line in State._lines.values():
+                    f.write(line)
+            os.rename(COMPACT_PATH, JOURNAL_PATH)
+        except OSError as e:
+            print(f"Error compacting state journal: {e}")
+            return
+
+        State._journal_lines = len(State._lines)
@@ -0,0 +1,71 @@
+# cached text measuring and rendering
+#
+# measuring and rasterising text is slow and most apps draw the same static
+# labels every frame. this keeps the size of each (font, string) pair the
+# first time it is measured, and renders each (font, string, colour) once
+# into an image so drawing it again is a single blit.
+#
+#   import textcache
+#
+#   screen.font = small_font
+#   textcache.center("Press B to start", 90, (255, 255, 255))
+#   w, h = textcache.measure("Score")
+#
+# the caches are emptied when they fill up, so strings that change every frame
+# (scores, timers) don't grow them without bound but gain nothing either.
+# colours are given as (r, g, b) or (r, g, b, a) tuples as brushes can't be
+# compared. only opaque colours are rendered into images, text in translucent
+# colours (shadows, faded labels) is drawn straight to the screen so it blends
+# the way it always has.
+
+from badgeware import screen, brushes, Image
+
+MAX_MEASURED = 64
+MAX_RENDERED = 24
+
+_measured = {}
+_rendered = {}
+
+
+def measure(string):
+    key = (screen.font, string)
+    size = _measured.get(key)
+    if size is None:
+        if len(_measured) >= MAX_MEASURED:
+            _measured.clear()
+        size = screen.measure_text(string)
+        _measured[key] = size
+    return size
+
+
+def draw(string, x, y, colour):
+    if len(colour) > 3 and colour[3] < 255:
+        screen.brush = brushes.color(*colour)
+        screen.text(string, x, y)
+        return
+
+    key = (screen.font, string, colour)
+    image = _rendered.get(key)
+    if image is None:
+        if len(_rendered) >= MAX_RENDERED:
+            _rendered.clear()
+        w, h = measure(string)
+        image = Image(0, 0, max(1, w), max(1, h))
+        image.font = screen.font
+        image.brush = brushes.color(*colour)
+        image.text(string, 0, 0)
+        _rendered[key] = image
+    screen.blit(image, int(x), int(y))
+
+
+# draw text centred between sx and ex
+def center(string, y, colour, sx=0, ex=160):
+    w, _ = measure(string)
+    draw(string, sx + (ex - sx) // 2 - w // 2, y, colour)
+
+
+# forget every measured and rendered string. they are keyed on the font, so
+# main.py calls this once the launcher exits, along with assets.release()
+def clear():
+    _measured.clear()
+    _rendered.clear()
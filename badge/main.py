@@ -7,6 +7,15 @@ import machine
 import gc
 import powman
 
+# shared modules for apps live in /system/lib
+sys.path.append("/system/lib")
+
+from store import State
+import power
+import governor
+import assets
+import textcache
+
 SKIP_CINEMATIC = powman.get_wake_reason() == powman.WAKE_WATCHDOG
 
 running_app = None
@@ -15,6 +24,8 @@ running_app = None
 def quit_to_launcher(pin):
     global running_app
     getattr(running_app, "on_exit", lambda: None)()
+    # Write out any saved state before the reset discards it
+    State.flush()
     # If we reset while boot is low, bad times
     while not pin.value():
         pass
@@ -30,6 +41,8 @@ if not SKIP_CINEMATIC:
         sys.path.pop(0)
 
     del startup
+    # drop the module too, otherwise it keeps its frames and assets alive
+    sys.modules.pop("/system/apps/startup", None)
 
     gc.collect()
 
@@ -41,6 +54,12 @@ if sys.path[0].startswith("/system/apps"):
     sys.path.pop(0)
 
 del menu
+sys.modules.pop("/system/apps/menu", None)
+
+# and anything the launcher loaded through the shared asset cache, or
+# measured and rendered through the text cache
+assets.release()
+textcache.clear()
 
 # make sure these can be re-imported by the app
 del sys.modules["ui"]
@@ -63,7 +82,15 @@ running_app = __import__(app)
 
 getattr(running_app, "init", lambda: None)()
 
-run(running_app.update)
+
+def update():
+    result = running_app.update()
+    State.tick()
+    power.tick()
+    return result
+
+
+governor.run(update)
 
 # Unreachable, in theory!
 machine.reset()
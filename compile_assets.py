@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Convert the badge's bundled PNG assets to paletted PNGs.
+
+Paletted images use roughly a quarter of the RAM of true colour images once
+loaded on the badge (see badgerware/Image.md), and their PNGs are smaller to
+read and inflate. This walks badge/apps/*/assets and badge/assets (which is
+/system/assets on the badge), converts every true colour PNG that has 256
+colours or fewer to an exact palette, strips editor metadata, and records the
+results in badge/assets/manifest.json.
+
+Images with more than 256 colours are left alone unless --lossy is given, in
+which case they are quantized to the best 256 colour palette.
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+from PIL import Image
+
+# Repository layout
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BADGE_DIR = os.path.join(ROOT, "badge")
+ASSET_GLOBS = [
+    "apps/*/assets/**/*.png",
+    "assets/**/*.png",
+]
+MANIFEST_PATH = os.path.join(BADGE_DIR, "assets", "manifest.json")
+
+# Where the badge directory ends up on the device
+DEVICE_ROOT = "/system"
+
+MAX_COLOURS = 256
+
+
+def find_assets():
+    """Return the path of every PNG asset, relative to the badge directory"""
+    paths = set()
+    for pattern in ASSET_GLOBS:
+        for path in glob.glob(os.path.join(BADGE_DIR, pattern), recursive=True):
+            paths.add(os.path.relpath(path, BADGE_DIR))
+    return sorted(paths)
+
+
+def ram_bytes(img):
+    """Estimate the RAM an image takes once loaded on the badge"""
+    width, height = img.size
+    if img.mode == "P":
+        return width * height + (len(img.getpalette()) // 3) * 4
+    return width * height * 4
+
+
+def exact_palette(rgba):
+    """Build a paletted copy of an RGBA image if it has few enough colours"""
+    colours = rgba.getcolors(MAX_COLOURS)
+    if colours is None:
+        return None
+
+    # Most transparent entries first, which keeps the tRNS chunk short
+    palette = sorted((colour for _, colour in colours), key=lambda c: (c[3], c))
+    lookup = {colour: i for i, colour in enumerate(palette)}
+
+    pixels = rgba.tobytes()
+    img = Image.new("P", rgba.size)
+    img.frombytes(bytes(lookup[tuple(pixels[i:i + 4])] for i in range(0, len(pixels), 4)))
+    img.putpalette([channel for colour in palette for channel in colour], "RGBA")
+    return img
+
+
+def quantized_palette(rgba):
+    """Quantize an RGBA image down to the best 256 colour palette"""
+    return rgba.quantize(colors=MAX_COLOURS, method=Image.Quantize.FASTOCTREE)
+
+
+def encode(img):
+    """Encode an image as a PNG without any metadata"""
+    out = io.BytesIO()
+    img.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def compile_asset(path, lossy=False, dry_run=False):
+    """Convert a single asset, returning its manifest entry"""
+    full_path = os.path.join(BADGE_DIR, path)
+    source_bytes = os.path.getsize(full_path)
+    source = Image.open(full_path)
+    source.load()
+
+    entry = {
+        "path": f"{DEVICE_ROOT}/{path}",
+        "width": source.width,
+        "height": source.height,
+        "source_mode": source.mode,
+        "source_bytes": source_bytes,
+        "source_ram": ram_bytes(source),
+    }
+
+    if source.mode == "P":
+        # Already paletted, just repack it without metadata
+        img, status = source, "paletted"
+    else:
+        rgba = source.convert("RGBA")
+        img, status = exact_palette(rgba), "converted"
+        if img is None:
+            if lossy:
+                img, status = quantized_palette(rgba), "quantized"
+            else:
+                img, status = source, "too many colours"
+
+    data = None
+    if status != "too many colours":
+        data = encode(img)
+
+        # Only repack an already paletted image if it saves space on flash
+        if status == "paletted" and len(data) >= source_bytes:
+            data, status = None, "unchanged"
+
+    if data is not None and not dry_run:
+        with open(full_path, "wb") as f:
+            f.write(data)
+
+    entry.update({
+        "status": status,
+        "mode": img.mode,
+        "colours": len(img.getpalette()) // 3 if img.mode == "P" else None,
+        "bytes": len(data) if data is not None else source_bytes,
+        "ram": ram_bytes(img),
+    })
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert badge PNG assets to paletted PNGs")
+    parser.add_argument("--lossy", action="store_true",
+                        help="quantize images with more than 256 colours")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report what would change without writing anything")
+    args = parser.parse_args()
+
+    manifest = []
+    for path in find_assets():
+        entry = compile_asset(path, args.lossy, args.dry_run)
+        manifest.append(entry)
+        print(f"{entry['status']:>16}  {path}  "
+              f"RAM {entry['source_ram']} -> {entry['ram']}  "
+              f"file {entry['source_bytes']} -> {entry['bytes']}")
+
+    source_ram = sum(entry["source_ram"] for entry in manifest)
+    ram = sum(entry["ram"] for entry in manifest)
+    print(f"\nTotal RAM {source_ram} -> {ram} bytes across {len(manifest)} assets")
+
+    if not args.dry_run:
+        with open(MANIFEST_PATH, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        print(f"Manifest saved to: {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import badger2040
 import badger_os
+import binascii
 import jpegdec
 import os
 import re
@@ -22,10 +23,20 @@ DETAILS_TEXT_SIZE = 2
 
 BADGE_PATH = "/badges/badge.txt"
 
+# Each composed badge is saved as a copy of the framebuffer, after a CRC of
+# everything that went into it, by font index and image name
+COMPOSED_DIR = "/state"
+COMPOSED_PREFIX = "badge++-"
+COMPOSED_PATH = COMPOSED_DIR + "/" + COMPOSED_PREFIX + "{}-{}.fb"
+
 FONTS = ["bitmap8", "serif", "sans", "gothic"]
 THICKNESSES = [1, 4, 4, 2]
 SIZE_ADJ = [1, 0.3, 0.3, 0.3]
 
+MIN_TEXT_SIZE = 0.09            # Names shrink no smaller than this to fit
+FIT_REFERENCE_SIZE = 1          # Scale text is measured at to work out the size that fits
+MAX_FITTED = 32                 # Fitted text kept in the saved state
+
 # Will be replaced with badge.txt
 # "Universe 2024", first_name, lastname_name, company, title, pronouns to the file on separate lines.
 DEFAULT_TEXT = """Universe 2024
@@ -44,13 +55,63 @@ she/her
 
 # Reduce the size of a string until it fits within a given width
 def truncate_string(text, text_size, width):
-    while True:
-        length = display.measure_text(text, text_size)
-        if length > 0 and length > width:
-            text = text[:-1]
+    return fitted("truncate", text, text_size, width, truncate_fit)
+
+
+# Reduce the scale of a string until it fits within a given width
+def fit_text_size(text, text_size, width):
+    return fitted("size", text, text_size, width, size_fit)
+
+
+# Fitting text is cached in the saved state by font, text, size and width, so
+# redrawing the badge after a button press measures nothing
+def fitted(kind, text, text_size, width, fit):
+    global fitted_changed
+    key = f"{kind}|{display_font}|{text_size}|{width}|{text}"
+    cache = state["fitted"]
+    result = cache.get(key)
+    if result is None:
+        result = fit(text, text_size, width)
+        if len(cache) >= MAX_FITTED:
+            cache.clear()
+        cache[key] = result
+        fitted_changed = True
+    return result
+
+
+def truncate_fit(text, text_size, width):
+    # Binary search for the longest start of the text that fits
+    low = 0
+    high = len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if display.measure_text(text[:middle], text_size) <= width:
+            low = middle
         else:
-            text += ""
-            return text
+            high = middle - 1
+    return text[:low]
+
+
+def size_fit(text, text_size, width):
+    # Text width is linear in its scale, so measure it once and work out the
+    # largest scale, in steps of 0.01 down from text_size, that fits
+    reference = display.measure_text(text, FIT_REFERENCE_SIZE)
+    if reference == 0 or reference * text_size / FIT_REFERENCE_SIZE < width:
+        return text_size
+
+    steps = int((text_size - width * FIT_REFERENCE_SIZE / reference) * 100) + 1
+    size = max(text_size - steps * 0.01, MIN_TEXT_SIZE)
+
+    # Allow for rounding in the measurement
+    if size > MIN_TEXT_SIZE and display.measure_text(text, size) >= width:
+        size = max(size - 0.01, MIN_TEXT_SIZE)
+    return size
+
+
+def set_font(font_idx):
+    global display_font
+    display_font = FONTS[font_idx]
+    display.set_font(display_font)
 
 
 # Extract the width of the image based on the file name.
@@ -66,14 +127,106 @@ def extract_image_width_from_filename(filename):
 #      Drawing functions
 # ------------------------------
 
-# Draw the badge, including user text
+# Draw the badge, from the cache of composed badges if it has been drawn before
 def draw_badge():
+    if not load_composed(state["picture_idx"], state["font_idx"]):
+        compose_badge(state["picture_idx"], state["font_idx"])
+        save_composed(state["picture_idx"], state["font_idx"])
+    display.update()
+
+
+# Compose the badge one more press of the last button would show, so it can
+# be shown straight from the cache. Only one is prepared, as decoding images
+# keeps the badge awake rather than halting
+def prepare_next():
+    if TOTAL_IMAGES == 0 or display.pressed_any():
+        return
+
+    picture_step, font_step = last_step
+    neighbour = ((state["picture_idx"] + picture_step) % TOTAL_IMAGES,
+                 (state["font_idx"] + font_step) % len(FONTS))
+    if composed_header(*neighbour) != read_composed_header(*neighbour):
+        compose_badge(*neighbour)
+        save_composed(*neighbour)
+
+
+def composed_path(picture_idx, font_idx):
+    return COMPOSED_PATH.format(font_idx, BADGE_IMAGES[picture_idx])
+
+
+def composed_header(picture_idx, font_idx):
+    # A CRC of the image, font and text, so edits to any of them are noticed
+    target_image = BADGE_IMAGES[picture_idx]
+    try:
+        image_size = os.stat(f"/badges/{target_image}")[6]
+    except OSError:
+        image_size = 0
+    details = f"{target_image}|{image_size}|{font_idx}|{first_name}|{last_name}|{title}|{pronouns}|{handle}"
+    return binascii.crc32(details.encode()).to_bytes(4, "little")
+
+
+def read_composed_header(picture_idx, font_idx):
+    try:
+        with open(composed_path(picture_idx, font_idx), "rb") as f:
+            return f.read(4)
+    except OSError:
+        return None
+
+
+# Delete composed badges of images that have gone, or whose image, font or
+# text has changed since, so they don't build up in flash
+def remove_stale_composed():
+    try:
+        names = os.listdir(COMPOSED_DIR)
+    except OSError:
+        return
+
+    for name in names:
+        if not name.startswith(COMPOSED_PREFIX) or not name.endswith(".fb"):
+            continue
+        font, _, image = name[len(COMPOSED_PREFIX):-3].partition("-")
+        try:
+            font_idx = int(font)
+            picture_idx = BADGE_IMAGES.index(image)
+        except ValueError:
+            font_idx = picture_idx = None
+        if font_idx is not None and 0 <= font_idx < len(FONTS) and \
+           read_composed_header(picture_idx, font_idx) == composed_header(picture_idx, font_idx):
+            continue
+        try:
+            os.remove(f"{COMPOSED_DIR}/{name}")
+        except OSError:
+            pass
+
+
+def load_composed(picture_idx, font_idx):
+    framebuffer = memoryview(display.display)
+    try:
+        with open(composed_path(picture_idx, font_idx), "rb") as f:
+            if f.read(4) != composed_header(picture_idx, font_idx):
+                return False
+            return f.readinto(framebuffer) == len(framebuffer)
+    except OSError:
+        return False
+
+
+def save_composed(picture_idx, font_idx):
+    try:
+        with open(composed_path(picture_idx, font_idx), "wb") as f:
+            f.write(composed_header(picture_idx, font_idx))
+            f.write(memoryview(display.display))
+    except OSError as e:
+        print(f"Could not save composed badge: {e}")
+
+
+# Draw the badge, including user text, into the framebuffer
+def compose_badge(picture_idx, font_idx):
     display.set_pen(15)
     display.clear()
     
     # Draw the background
     try:
-        target_image = BADGE_IMAGES[state["picture_idx"]]
+        target_image = BADGE_IMAGES[picture_idx]
         image_size = extract_image_width_from_filename(target_image)
         TEXT_WIDTH = WIDTH - LEFT_PADDING - image_size
 
@@ -94,37 +247,25 @@ def draw_badge():
 
     # Draw the firstname.
     display.set_pen(0)
-    display.set_font(FONTS[state["font_idx"]])
-    display.set_thickness(THICKNESSES[state["font_idx"]])
+    set_font(font_idx)
+    display.set_thickness(THICKNESSES[font_idx])
     
-    size_adjustment = SIZE_ADJ[state["font_idx"]]
+    size_adjustment = SIZE_ADJ[font_idx]
     vertical_adjustment = (int(1 / size_adjustment) - 1) * 5
 
     # Draw the firstname, scaling it based on the available width
     display.set_pen(0)
-    name_size = 4 * size_adjustment  # A sensible starting scale
-    while True:
-        name_length = display.measure_text(first_name, name_size)
-        if name_length >= TEXT_WIDTH and name_size >= 0.1:
-            name_size -= 0.01
-        else:
-            display.text(first_name, LEFT_PADDING, 5 + vertical_adjustment, TEXT_WIDTH, name_size)
-            break
+    name_size = fit_text_size(first_name, 4 * size_adjustment, TEXT_WIDTH)  # Starting from a sensible scale
+    display.text(first_name, LEFT_PADDING, 5 + vertical_adjustment, TEXT_WIDTH, name_size)
 
     # Draw the lastname, scaling it based on the available width
     display.set_pen(0)
-    lastname_size = 3 * size_adjustment  # A sensible starting scale
-    while True:
-        lastname_length = display.measure_text(last_name, lastname_size)
-        if lastname_length >= TEXT_WIDTH and lastname_size >= 0.1:
-            lastname_size -= 0.01
-        else:
-            display.text(last_name, LEFT_PADDING, NAME_HEIGHT + LINE_SPACING + vertical_adjustment, TEXT_WIDTH, lastname_size)
-            break
+    lastname_size = fit_text_size(last_name, 3 * size_adjustment, TEXT_WIDTH)  # Starting from a sensible scale
+    display.text(last_name, LEFT_PADDING, NAME_HEIGHT + LINE_SPACING + vertical_adjustment, TEXT_WIDTH, lastname_size)
 
     # Draw the title and pronouns, aligned to the bottom & truncated to fit on one line
     display.set_pen(0)
-    display.set_thickness(int(THICKNESSES[state["font_idx"]] / 2))
+    display.set_thickness(int(THICKNESSES[font_idx] / 2))
     
     # Title
     display.text(title, LEFT_PADDING, HEIGHT - (DETAILS_HEIGHT * 2) - LINE_SPACING - 2, TEXT_WIDTH, DETAILS_TEXT_SIZE * size_adjustment)
@@ -135,8 +276,6 @@ def draw_badge():
         display.text(pronouns, LEFT_PADDING, HEIGHT - DETAILS_HEIGHT, TEXT_WIDTH, DETAILS_TEXT_SIZE * size_adjustment)
     else:
         display.text(handle, LEFT_PADDING, HEIGHT - DETAILS_HEIGHT, TEXT_WIDTH, DETAILS_TEXT_SIZE * size_adjustment)
-    
-    display.update()
 
 
 # ------------------------------
@@ -146,10 +285,17 @@ def draw_badge():
 # Global variables
 state = {
     "font_idx": 0,
-    "picture_idx": 0
+    "picture_idx": 0,
+    "fitted": {}
 }
 badger_os.state_load("badge++", state)
 
+# The firmware's font, until one is chosen
+display_font = "default"
+
+# Whether text has been fitted since the state was saved
+fitted_changed = False
+
 # Create a new Badger and set it to update NORMAL
 display = badger2040.Badger2040()
 display.led(128)
@@ -213,8 +359,18 @@ state["picture_idx"] = max(state["picture_idx"], TOTAL_IMAGES - 1)
 #       Main program loop
 # ------------------------------
 
+# The picture and font steps of the last button pressed
+last_step = (1, 0)
+
 changed = False
+remove_stale_composed()
 draw_badge()
+prepare_next()
+
+# Only write to flash when there is newly fitted text to keep
+if fitted_changed:
+    badger_os.state_save("badge++", state)
+    fitted_changed = False
 
 while True:
     # Sometimes a button press or hold will keep the system
@@ -227,6 +383,7 @@ while True:
         if (state["picture_idx"] < 0):
             state["picture_idx"] = TOTAL_IMAGES - 1
     
+        last_step = (-1, 0)
         changed = True
 
     # Was the image requested to be changed?
@@ -235,6 +392,7 @@ while True:
         if (state["picture_idx"] >= TOTAL_IMAGES):
             state["picture_idx"] = 0
     
+        last_step = (1, 0)
         changed = True
 
     # Was the font requested to be changed?
@@ -243,6 +401,7 @@ while True:
         if (state["font_idx"] >= len(FONTS)):
             state["font_idx"] = 0
             
+        last_step = (0, 1)
         changed = True
 
     # Was the font requested to be changed?
@@ -251,11 +410,14 @@ while True:
         if (state["font_idx"] <= 0):
             state["font_idx"] = len(FONTS) - 1
 
+        last_step = (0, -1)
         changed = True
 
     if changed:
         draw_badge()
+        prepare_next()
         badger_os.state_save("badge++", state)
+        fitted_changed = False
         changed = False
 
     display.halt()
@@ -0,0 +1,128 @@
+import badger2040
+
+# Partial updates must start and end on a multiple of 8 rows
+ROW_ALIGN = 8
+
+# Partial updates between full refreshes, which clear any ghosting
+FULL_EVERY = 20
+# Regions this many pixels apart or closer are refreshed as one
+MERGE_GAP = 8
+# More regions than this are refreshed as their bounding box. Every
+# partial_update runs a whole refresh waveform however small its region, so
+# refreshing one box is quicker than refreshing several smaller ones
+MAX_REGIONS = 1
+# A full refresh is used once this percentage of the screen has changed
+FULL_AREA_PERCENT = 60
+
+
+class RegionRefresher():
+    """
+    Tracks the regions of the display drawn to since the last update, so only
+    those regions are refreshed with `partial_update`.
+
+    Call `mark` with the bounds of anything drawn, or that was drawn last
+    frame and has since been erased, then `update` once the frame is drawn.
+    By default each update refreshes the bounding box of everything marked
+    in a single partial update. Every `full_every` partial updates the whole
+    screen is refreshed instead to clear ghosting.
+    """
+    def __init__(self, display, width=badger2040.WIDTH, height=badger2040.HEIGHT,
+                 full_every=FULL_EVERY, merge_gap=MERGE_GAP, max_regions=MAX_REGIONS):
+        self.display = display
+        self.width = width
+        self.height = height
+        self.full_every = full_every
+        self.merge_gap = merge_gap
+        self.max_regions = max_regions
+
+        self.regions = []
+        self.partials = 0
+        self.everything = False
+
+    def mark(self, x, y, w, h):
+        # Clip the region to the screen, and widen it to whole 8 row bands
+        x0 = max(x, 0)
+        x1 = min(x + w, self.width)
+        y0 = max(y, 0) // ROW_ALIGN * ROW_ALIGN
+        y1 = min((y + h + ROW_ALIGN - 1) // ROW_ALIGN * ROW_ALIGN, self.height)
+        if x0 < x1 and y0 < y1:
+            self.regions.append([x0, y0, x1, y1])
+
+    def mark_all(self):
+        # The next update refreshes the whole screen
+        self.everything = True
+
+    def full(self):
+        # Refreshes the whole screen now, restarting the count of partial updates
+        self.display.update()
+        self.regions = []
+        self.partials = 0
+        self.everything = False
+
+    def bounding_box(self, regions):
+        return [min(r[0] for r in regions), min(r[1] for r in regions),
+                max(r[2] for r in regions), max(r[3] for r in regions)]
+
+    def coalesce(self):
+        """
+        Returns the marked regions as a list of `[x0, y0, x1, y1]`, with
+        overlapping and nearby regions merged together, or just their
+        bounding box if no more than one region is allowed.
+        """
+        regions = self.regions
+        if len(regions) > 1 and self.max_regions <= 1:
+            self.regions = [self.bounding_box(regions)]
+            return self.regions
+
+        gap = self.merge_gap
+        merged = True
+        while merged:
+            merged = False
+            i = 0
+            while i < len(regions):
+                a = regions[i]
+                j = i + 1
+                while j < len(regions):
+                    b = regions[j]
+                    if b[0] - gap <= a[2] and a[0] - gap <= b[2] and b[1] - gap <= a[3] and a[1] - gap <= b[3]:
+                        a[0] = min(a[0], b[0])
+                        a[1] = min(a[1], b[1])
+                        a[2] = max(a[2], b[2])
+                        a[3] = max(a[3], b[3])
+                        regions.pop(j)
+                        merged = True
+                    else:
+                        j += 1
+                i += 1
+
+        if len(regions) > self.max_regions:
+            regions = [self.bounding_box(regions)]
+        self.regions = regions
+        return regions
+
+    def update(self):
+        """
+        Refreshes everything marked since the last update. Returns False if
+        nothing was marked, so nothing was refreshed.
+        """
+        if self.everything:
+            self.full()
+            return True
+
+        regions = self.coalesce()
+        if len(regions) == 0:
+            return False
+
+        area = 0
+        for x0, y0, x1, y1 in regions:
+            area += (x1 - x0) * (y1 - y0)
+
+        if self.partials >= self.full_every or area * 100 >= self.width * self.height * FULL_AREA_PERCENT:
+            self.full()
+            return True
+
+        for x0, y0, x1, y1 in regions:
+            self.display.partial_update(x0, y0, x1 - x0, y1 - y0)
+        self.partials += 1
+        self.regions = []
+        return True
@@ -1,6 +1,8 @@
 import badger2040
 import gc
+import os
 import badger_os
+from array import array
 
 # **** Put the name of your text file here *****
 text_file = "/examples/copilot-book.txt"  # File must be on the MicroPython device
@@ -21,6 +23,14 @@ TEXT_WIDTH = WIDTH - TEXT_PADDING - TEXT_PADDING - ARROW_WIDTH
 
 FONTS = ["sans", "serif", "bitmap8", "cursive"]
 THICKNESSES = [1, 2, 2, 1]
+
+# The page start offsets of the book are saved for each font and size, with
+# the size of the book first so an edited book is paginated again
+INDEX_PATH = "/state/ebook-{}-{}.idx"
+
+# Glyphs are measured as a run of this many, so rounding of their scaled
+# widths averages out when lines are measured by adding glyphs up
+GLYPH_SAMPLE = 8
 # ------------------------------
 #      Drawing functions
 # ------------------------------
@@ -54,8 +64,14 @@ def draw_frame():
     if state["current_page"] > 0:
         draw_up(WIDTH - ARROW_WIDTH, (HEIGHT // 4) - (ARROW_HEIGHT // 2),
                 ARROW_WIDTH, ARROW_HEIGHT, ARROW_THICKNESS, ARROW_PADDING)
-    draw_down(WIDTH - ARROW_WIDTH, ((HEIGHT * 3) // 4) - (ARROW_HEIGHT // 2),
-              ARROW_WIDTH, ARROW_HEIGHT, ARROW_THICKNESS, ARROW_PADDING)
+    if state["current_page"] < len(offsets) - 1:
+        draw_down(WIDTH - ARROW_WIDTH, ((HEIGHT * 3) // 4) - (ARROW_HEIGHT // 2),
+                  ARROW_WIDTH, ARROW_HEIGHT, ARROW_THICKNESS, ARROW_PADDING)
+
+    # Show the page number between the arrows
+    display.set_font("bitmap6")
+    page = str(state["current_page"] + 1)
+    display.text(page, WIDTH - (ARROW_WIDTH + display.measure_text(page, 1)) // 2, (HEIGHT // 2) - 3, WIDTH, 1)
 
 
 # ------------------------------
@@ -64,15 +80,20 @@ def draw_frame():
 
 # Global variables
 state = {
-    "last_offset": 0,
     "current_page": 0,
     "font_idx": 0,
-    "text_size": 0.5,
-    "offsets": []
+    "text_size": 0.5
 }
 badger_os.state_load("ebook", state)
 
+# Offsets are now indexed in their own file, rather than saved as they're visited
+state.pop("offsets", None)
+state.pop("last_offset", None)
+
 text_spacing = int(34 * state["text_size"])
+rows_per_page = 1
+glyph_widths = {}
+offsets = array("I", [0])
 
 
 # Create a new Badger and set it to update FAST
@@ -82,111 +103,180 @@ display.set_update_speed(badger2040.UPDATE_FAST)
 
 
 # ------------------------------
-#         Render page
+#        Text layout
 # ------------------------------
 
-def render_page():
-    row = 0
-    line = ""
-    pos = ebook.tell()
-    next_pos = pos
-    add_newline = False
+def use_font():
+    global text_spacing, rows_per_page
     display.set_font(FONTS[state["font_idx"]])
     display.set_thickness(THICKNESSES[state["font_idx"]])
+    text_spacing = int(34 * state["text_size"])
+
+    # A page fills all the rows that end above the bottom of the display
+    rows_per_page = max(1, (HEIGHT + text_spacing - 1) // text_spacing - 1)
+
+    # Widths measured for the last font and size no longer apply
+    glyph_widths.clear()
+
+
+def text_width(text):
+    width = 0
+    for char in text:
+        char_width = glyph_widths.get(char)
+        if char_width is None:
+            char_width = display.measure_text(char * GLYPH_SAMPLE, state["text_size"]) / GLYPH_SAMPLE
+            glyph_widths[char] = char_width
+        width += char_width
+    return width
+
+
+def clean_word(word):
+    # Swap the curly quotes the fonts lack for plain ones
+    word = str(word.strip(), "utf-8")
+    if '\u201c' in word:
+        word = word.replace('\u201c', '\"')
+    if '\u201d' in word:
+        word = word.replace('\u201d', '\"')
+    if '\u2019' in word:
+        word = word.replace('\u2019', '\'')
+    return word
+
+
+def layout_rows():
+    # Lay out the book from the current position of the file, yielding the
+    # text of each row and the offset its first word starts at. Lines of the
+    # file run on into each other, and a blank line gives a blank row
+    line = ""
+    width = 0
+    start = offset = ebook.tell()
+    space = text_width(" ")
 
     while True:
-        # Read a full line and split it into words
-        words = ebook.readline().split(" ")
-
-        # Take the length of the first word and advance our position
-        next_word = words[0]
-        if len(words) > 1:
-            next_pos += len(next_word) + 1
-        else:
-            next_pos += len(next_word)  # This is the last word on the line
-
-        # Advance our position further if the word contains special characters
-        if '\u201c' in next_word:
-            next_word = next_word.replace('\u201c', '\"')
-            next_pos += 2
-        if '\u201d' in next_word:
-            next_word = next_word.replace('\u201d', '\"')
-            next_pos += 2
-        if '\u2019' in next_word:
-            next_word = next_word.replace('\u2019', '\'')
-            next_pos += 2
-
-        # Rewind the file back from the line end to the start of the next word
-        ebook.seek(next_pos)
-
-        # Strip out any new line characters from the word
-        next_word = next_word.strip()
-
-        # If an empty word is encountered assume that means there was a blank line
-        if len(next_word) == 0:
-            add_newline = True
-
-        # Append the word to the current line and measure its length
-        appended_line = line
-        if len(line) > 0 and len(next_word) > 0:
-            appended_line += " "
-        appended_line += next_word
-        appended_length = display.measure_text(appended_line, state["text_size"])
-
-        # Would this appended line be longer than the text display area, or was a blank line spotted?
-        if appended_length >= TEXT_WIDTH or add_newline:
-
-            # Yes, so write out the line prior to the append
-            print(line)
-            display.set_pen(0)
-            display.text(line, TEXT_PADDING, (row * text_spacing) + (text_spacing // 2) + TEXT_PADDING, WIDTH, state["text_size"])
-
-            # Clear the line and move on to the next row
+        raw = ebook.readline()
+        if len(raw) == 0:
+            break
+        line_end = offset + len(raw)
+
+        if len(raw.strip()) == 0:
+            if len(line) > 0:
+                yield line, start
+            yield "", offset
             line = ""
-            row += 1
-
-            # Have we reached the end of the page?
-            if (row * text_spacing) + text_spacing >= HEIGHT:
-                print("+++++")
-                display.update()
-
-                # Reset the position to the start of the word that made this line too long
-                ebook.seek(pos)
-                return
-            else:
-                # Set the line to the word and advance the current position
-                line = next_word
-                pos = next_pos
-
-            # A new line was spotted, so advance a row
-            if add_newline:
-                print("")
-                row += 1
-                if (row * text_spacing) + text_spacing >= HEIGHT:
-                    print("+++++")
-                    display.update()
-                    return
-                add_newline = False
+            start = offset = line_end
+            continue
+
+        word_start = offset
+        for word in raw.split(b" "):
+            next_start = word_start + len(word) + 1
+            text = clean_word(word)
+            if len(text) > 0:
+                text_length = text_width(text)
+
+                # Add the word to the line if it fits, otherwise start a new line with it
+                if len(line) > 0 and width + space + text_length < TEXT_WIDTH:
+                    line += " " + text
+                    width += space + text_length
+                else:
+                    if len(line) > 0:
+                        yield line, start
+                    line = text
+                    width = text_length
+                    start = word_start
+            word_start = next_start
+
+        offset = line_end
+
+    if len(line) > 0:
+        yield line, start
+
+
+def build_index():
+    # Lay out the whole book in one pass, noting where each page starts
+    index = array("I", [0])
+    rows = 0
+    ebook.seek(0)
+    for _, start in layout_rows():
+        if rows == rows_per_page:
+            index.append(start)
+            rows = 0
+        rows += 1
+    return index
+
+
+def load_index():
+    path = INDEX_PATH.format(state["font_idx"], round(state["text_size"] * 10))
+    try:
+        with open(path, "rb") as f:
+            saved = array("I", f.read())
+        if len(saved) > 1 and saved[0] == book_size:
+            return saved[1:]
+    except OSError:
+        pass
+
+    index = build_index()
+    try:
+        with open(path, "wb") as f:
+            f.write(array("I", [book_size]))
+            f.write(index)
+    except OSError as e:
+        print(f"Could not save page index: {e}")
+    return index
+
+
+def find_page(offset):
+    # Binary search for the page that the offset falls on
+    low = 0
+    high = len(offsets) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if offsets[middle] <= offset:
+            low = middle
         else:
-            # The appended line was not too long, so set it as the line and advance the current position
-            line = appended_line
-            pos = next_pos
+            high = middle - 1
+    return low
+
+
+def change_layout():
+    global offsets
+    # Stay on the page showing the start of the current one
+    offset = offsets[state["current_page"]]
+    use_font()
+    offsets = load_index()
+    state["current_page"] = find_page(offset)
+
+
+# ------------------------------
+#         Render page
+# ------------------------------
+
+def render_page():
+    display.set_font(FONTS[state["font_idx"]])
+    display.set_thickness(THICKNESSES[state["font_idx"]])
+    display.set_pen(0)
+
+    ebook.seek(offsets[state["current_page"]])
+    row = 0
+    for line, _ in layout_rows():
+        display.text(line, TEXT_PADDING, (row * text_spacing) + (text_spacing // 2) + TEXT_PADDING, WIDTH, state["text_size"])
+        row += 1
+        if row == rows_per_page:
+            break
+
+    display.update()
 
 
 # ------------------------------
 #       Main program loop
 # ------------------------------
 
-launch = True
-changed = False
+# Open the book file, and index its pages for the current font and size
+ebook = open(text_file, "rb")
+book_size = os.stat(text_file)[6]
+use_font()
+offsets = load_index()
+state["current_page"] = min(state["current_page"], len(offsets) - 1)
 
-# Open the book file
-ebook = open(text_file, "r")
-if len(state["offsets"]) > state["current_page"]:
-    ebook.seek(state["offsets"][state["current_page"]])
-else:
-    state["current_page"] = 0
-    state["offsets"] = []
+changed = True
 
 while True:
     # Sometimes a button press or hold will keep the system
@@ -195,52 +285,40 @@ while True:
 
     # Was the next page button pressed?
     if display.pressed(badger2040.BUTTON_DOWN):
-        state["current_page"] += 1
-
-        changed = True
+        if state["current_page"] < len(offsets) - 1:
+            state["current_page"] += 1
+            changed = True
 
     # Was the previous page button pressed?
     if display.pressed(badger2040.BUTTON_UP):
         if state["current_page"] > 0:
             state["current_page"] -= 1
-            if state["current_page"] == 0:
-                ebook.seek(0)
-            else:
-                ebook.seek(state["offsets"][state["current_page"] - 1])  # Retrieve the start position of the last page
             changed = True
 
     if display.pressed(badger2040.BUTTON_A):
-        state["text_size"] += 0.1
+        state["text_size"] = round(state["text_size"] + 0.1, 1)
         if state["text_size"] > 0.8:
             state["text_size"] = 0.5
-        text_spacing = int(34 * state["text_size"])
-        state["offsets"] = []
-        ebook.seek(0)
-        state["current_page"] = 0
+        change_layout()
         changed = True
 
     if display.pressed(badger2040.BUTTON_B):
         state["font_idx"] += 1
         if (state["font_idx"] >= len(FONTS)):
             state["font_idx"] = 0
-        state["offsets"] = []
-        ebook.seek(0)
-        state["current_page"] = 0
+        change_layout()
         changed = True
 
-    if launch and not changed:
-        if state["current_page"] > 0 and len(state["offsets"]) > state["current_page"] - 1:
-            ebook.seek(state["offsets"][state["current_page"] - 1])
+    # Jump a tenth of the way through the book, back to the start after the end
+    if display.pressed(badger2040.BUTTON_C):
+        state["current_page"] += max(1, len(offsets) // 10)
+        if state["current_page"] >= len(offsets):
+            state["current_page"] = 0
         changed = True
-        launch = False
 
     if changed:
         draw_frame()
         render_page()
-
-        # Is the next page one we've not displayed before?
-        if state["current_page"] >= len(state["offsets"]):
-            state["offsets"].append(ebook.tell())  # Add its start position to the state["offsets"] list
         badger_os.state_save("ebook", state)
 
         changed = False
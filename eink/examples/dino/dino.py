@@ -3,6 +3,7 @@ import time
 import random
 import io
 from machine import Pin
+from refresh import RegionRefresher
 
 badger2040.system_speed(badger2040.SYSTEM_FAST)
 
@@ -20,6 +21,42 @@ class Image():
             img = bytearray(f.read())
         self.bitmap, self.width, self.height = img, w, h
 
+        # Each row as an int with a bit set for each pixel, leftmost pixel
+        # in bit 0, for testing collisions a row at a time
+        stride = (w + 7) >> 3
+        self.rows = []
+        for oy in range(h):
+            row = 0
+            for ox in range(w):
+                if img[oy * stride + (ox >> 3)] & (0b10000000 >> (ox & 0b111)):
+                    row |= 1 << ox
+            self.rows.append(row)
+
+        # The set pixels as rectangles, so the sprite is drawn with a call
+        # per run of pixels rather than per pixel. Runs that line up with
+        # the run on the row above are merged into one taller rectangle
+        spans = []
+        above = {}
+        for oy, row in enumerate(self.rows):
+            here = {}
+            ox = 0
+            while row >> ox:
+                if not (row >> ox) & 1:
+                    ox += 1
+                    continue
+                start = ox
+                while (row >> ox) & 1:
+                    ox += 1
+                run = (start, ox - start)
+                index = above.get(run)
+                if index is None:
+                    index = len(spans)
+                    spans.append([start, oy, ox - start, 0])
+                spans[index][3] += 1
+                here[run] = index
+            above = here
+        self.spans = [tuple(span) for span in spans]
+
 class Sprite():
     def __init__(self, x, y, image, display):
         self.set_pos(x, y)
@@ -31,12 +68,13 @@ class Sprite():
 
     def draw(self):
         if self.image is not None:
-            for oy in range(self.image.height):
-                for ox in range(self.image.width):
-                    o = oy * (self.image.width >> 3) + (ox >> 3)
-                    bm = 0b10000000 >> (ox & 0b111)
-                    if self.image.bitmap[o] & bm:
-                        self.display.pixel(int(self.x) + ox, int(self.y) + oy)
+            x = int(self.x)
+            y = int(self.y)
+            for ox, oy, w, h in self.image.spans:
+                self.display.rectangle(x + ox, y + oy, w, h)
+
+    def bounds(self):
+        return int(self.x), int(self.y), self.image.width, self.image.height
 
     def set_pos(self, x=None, y=None):
         if x is not None:
@@ -73,9 +111,21 @@ class MovingObject(Sprite):
         return self.y == self.ground - self.image.height
 
     def collision_test(self, obstacles):
+        x = int(self.x)
+        y = int(self.y)
         for obstacle in obstacles:
-            if (self.x + self.image.width >= obstacle.x and obstacle.x + obstacle.image.width >= self.x and self.y + self.image.height >= obstacle.y and obstacle.y + obstacle.image.height >= self.y):
-                return obstacle
+            ox = int(obstacle.x)
+            oy = int(obstacle.y)
+            if (x + self.image.width <= ox or ox + obstacle.image.width <= x or y + self.image.height <= oy or oy + obstacle.image.height <= y):
+                continue
+
+            # The boxes overlap, so check whether any set pixels do, a row at a time
+            shift = ox - x
+            for row_y in range(max(y, oy), min(y + self.image.height, oy + obstacle.image.height)):
+                row = obstacle.image.rows[row_y - oy]
+                row = row << shift if shift >= 0 else row >> -shift
+                if self.image.rows[row_y - y] & row:
+                    return obstacle
         return None
 
 # Global variables
@@ -86,6 +136,7 @@ button_up = Pin(badger2040.BUTTON_UP, Pin.IN, Pin.PULL_DOWN)
 display = badger2040.Badger2040()
 display_width = badger2040.WIDTH
 display_height = badger2040.HEIGHT
+refresher = RegionRefresher(display)
 
 high_score_path = "/highscore.txt"
 high_score = 0
@@ -115,7 +166,7 @@ def game_loop():
 
     clear_screen()
     display.set_update_speed(badger2040.UPDATE_TURBO)
-    display.update()
+    refresher.full()
 
     now = time.ticks_ms()
     for o in objects:
@@ -125,6 +176,7 @@ def game_loop():
     cactus.set_pos(display_width - cactus_img.width, display_height - cactus_img.height)
     cactus2.set_pos(4 * display_width - cactus_img.width, display_height - cactus_img.height)
 
+    score_text = ""
     while True:
         clear_screen()
         now = time.ticks_ms()
@@ -135,11 +187,17 @@ def game_loop():
                 o.set_pos(x=display_width + random.randint(0, display_width))
                 score += 1
                 o.set_motion_vector(-1 - score * 0.05, 0)
+        # Refresh where each object was last frame and where it is now
         for o in objects:
+            refresher.mark(*o.bounds())
             o.physics_tick(now)
             o.draw()
-        display.text("Score: " + str(score), 10, 10)
-        display.update()
+            refresher.mark(*o.bounds())
+        if score_text != "Score: " + str(score):
+            score_text = "Score: " + str(score)
+            refresher.mark(10, 10, display.measure_text(score_text), 16)     # bitmap8 at the default scale of 2
+        display.text(score_text, 10, 10)
+        refresher.update()
         if player.collision_test(obstacles) is not None or display.pressed(badger2040.BUTTON_A):
             break
 
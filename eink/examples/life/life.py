@@ -1,6 +1,7 @@
 import badger2040
 import random
 import time
+from refresh import RegionRefresher
 
 WIDTH        = 45
 HEIGHT       = 12
@@ -9,11 +10,13 @@ EMPTY_CELL   = ' '
 DEBUG        = False
 RUNNING      = True
 REFRESH_RATE = 0.5
+ROW_SPACING  = 10
+TEXT_HEIGHT  = 16    # bitmap8 at the default scale of 2, so rows overlap
 
 def initialize_grid():
     return [[random.choice([EMPTY_CELL, CELL]) for _ in range(WIDTH)] for _ in range(HEIGHT)]
 
-def print_grid(grid):
+def print_grid(grid, shown):
     badger.set_pen(0)
     badger.clear()
     badger.set_pen(15)
@@ -21,9 +24,25 @@ def print_grid(grid):
     badger.set_thickness(1)
 
     for k, row in enumerate(grid):
-        badger.text(''.join(row), 0, k*10)
-    
-    badger.update()
+        text = ''.join(row)
+        badger.text(text, 0, k*ROW_SPACING)
+
+        # Only refresh the span of each row that differs from the grid shown
+        if shown is None or row == shown[k]:
+            continue
+        first = 0
+        while row[first] == shown[k][first]:
+            first += 1
+        last = len(row) - 1
+        while row[last] == shown[k][last]:
+            last -= 1
+        x = badger.measure_text(text[:first])
+        refresher.mark(x, k*ROW_SPACING, badger.measure_text(text[:last+1]) - x, TEXT_HEIGHT)
+
+    if shown is None:
+        refresher.full()
+    else:
+        refresher.update()
     
 def write_text(text):
     badger.set_pen(0)
@@ -32,7 +51,7 @@ def write_text(text):
     badger.set_font("bitmap8")
     badger.set_thickness(1)
     badger.text(text, 25, 25)
-    badger.update()
+    refresher.full()
     time.sleep(1)
 
 def count_neighbors(grid, x, y):
@@ -73,13 +92,16 @@ def update_grid(grid):
 # ----------------------------------------------------------------
 badger = badger2040.Badger2040()
 badger.set_update_speed(2)
+refresher = RegionRefresher(badger)
 grid = initialize_grid()
+shown = None    # The grid on screen, or None after a message
 
 while True:
     if badger.pressed(badger2040.BUTTON_A):
         # Re-initialize the grid with a new random pattern
         grid = initialize_grid()
         write_text('Grid re-initialized')
+        shown = None
         if DEBUG:
             print('BUTTON_A: grid re-initialized')
     
@@ -87,6 +109,7 @@ while True:
         # Toggle the running state
         RUNNING = not RUNNING
         write_text('Running: ' + str(RUNNING))
+        shown = None
         if DEBUG:
             print('BUTTON_B: toggle running state: ', RUNNING)
 
@@ -95,6 +118,7 @@ while True:
         if REFRESH_RATE - 0.1 > 0:
             REFRESH_RATE -= 0.1
         write_text('Refresh rate: ' + str(REFRESH_RATE))
+        shown = None
         if DEBUG:
             print('BUTTON_UP: refresh rate inc: ', REFRESH_RATE)
     
@@ -102,11 +126,13 @@ while True:
         # Decrease the refresh rate (higher is slower)
         REFRESH_RATE += 0.1
         write_text('Refresh rate: ' + str(REFRESH_RATE))
+        shown = None
         if DEBUG:
             print('BUTTON_DOWN: refresh rate dec: ', REFRESH_RATE)
 
     if RUNNING:
-        print_grid(grid)
+        print_grid(grid, shown)
+        shown = grid
         grid = update_grid(grid)
         time.sleep(REFRESH_RATE)
 
@@ -4,6 +4,7 @@ from badger2040 import UPDATE_NORMAL, UPDATE_MEDIUM, UPDATE_FAST, UPDATE_TURBO,
 from time import sleep
 import random
 import gc
+from refresh import RegionRefresher
 
 # **SCREEN IS USED IN PORTRAIT**
 
@@ -28,6 +29,7 @@ LETTERS = C("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
 grid = [[""]*5] * 6
 
 display = badger2040.Badger2040()
+refresher = RegionRefresher(display)
 
 ### Functions ###
 
@@ -72,6 +74,7 @@ def draw_cell(x, y, outline, fill, text, char):
     # Top left of this cell
     org_x = GRID_ORIGIN_X + CELL_SIDE*x + CELL_SPACING*x
     org_y = GRID_ORIGIN_Y + CELL_SIDE*y + CELL_SPACING*y
+    refresher.mark(org_x, org_y, CELL_SIDE+1, CELL_SIDE+1)
     # Fill block
     display.set_pen(fill)
     display.rectangle(org_x, org_y, CELL_SIDE+1, CELL_SIDE+1) # +1 because rectangle width/height isn't inclusive
@@ -102,21 +105,24 @@ def draw_cell(x, y, outline, fill, text, char):
 #     Wrong cell: black outline, black fill, white letter
 #     Unsubmitted cell: black outline, white fill, black letter
 
+def draw_row(y):
+    for x in range(5):
+        char = grid[y][x]
+        if char == "":
+            # Empty
+            draw_cell(x, y, 0, 15, 0, char)
+        elif char == WORD[x]:
+            # Correct
+            draw_cell(x, y, 0, 15, 0, char)
+        elif char in WORD:
+            # In word but wrong place
+            draw_cell(x, y, 0, 9, 0, char)
+        elif char not in WORD:
+            draw_cell(x, y, 0, 0, 15, char)
+
 def draw_grid():
     for y in range(6):
-        for x in range(5):
-            char = grid[y][x]
-            if char == "":
-                # Empty
-                draw_cell(x, y, 0, 15, 0, char)
-            elif char == WORD[x]:
-                # Correct
-                draw_cell(x, y, 0, 15, 0, char)
-            elif char in WORD:
-                # In word but wrong place
-                draw_cell(x, y, 0, 9, 0, char)
-            elif char not in WORD:
-                draw_cell(x, y, 0, 0, 15, char)
+        draw_row(y)
 
 
 ### Main code ###
@@ -142,7 +148,7 @@ display.set_pen(0)
 display.set_font(HEADER_FONT)
 display.text("Wordle", WIDTH-35, HALF_H-51, scale=1, angle=90)
 draw_grid()
-display.update()
+refresher.full()
 
 ### Letter selection ###
 
@@ -191,9 +197,9 @@ while True:
         # Reset data for row
         row = [""] * 5
         row_char_idx = [-1] * 5
-        # Draw grid
+        # Draw the submitted row, as only its cells change colour
         display.set_update_speed(UPDATE_FAST)
-        draw_grid()
+        draw_row(pos_y-1)
         
         # Is the game over?
         if pos_y == 6 or "".join(grid[pos_y-1]) == WORD:
@@ -219,7 +225,7 @@ while True:
     
     # A button was pressed, so draw
     draw_cell(pos_x, pos_y, 0, 15, 0, row[pos_x])
-    display.update()
+    refresher.update()
     display.set_update_speed(UPDATE_TURBO) # Reset update speed in case it was changed
 
 
@@ -2,5 +2,15 @@
 #
 # SPDX-License-Identifier: MIT
 
-from .send import NECSender
-from .receive import NECReceiver
+from .scheduler import BeaconScheduler
+
+try:
+    from .send import NECSender
+    from .receive import NECReceiver
+    from .universal import UniversalReceiver
+    from .link import LinkSender, LinkReceiver, DataLink
+except ImportError:
+    # Without the rp2 hardware modules (such as on MicroPython's unix port)
+    # only the decoders in `protocols` are available, for use with recorded
+    # pulses
+    pass
@@ -17,6 +17,21 @@ NEC_REPEAT = const(-1)
 NEC_ALLOWED_DEVIATION_PERCENT = const(0.3)
 NEC_REPEAT_TIMEOUT_MS = const(150)
 
+# Exclusive integer bounds for each pulse the receiver checks, matching the
+# allowed deviation above, so pulses can be classified with plain compares
+NEC_START_BURST_MIN_US = const(NEC_START_BURST_US * 7 // 10)
+NEC_START_BURST_MAX_US = const(NEC_START_BURST_US * 13 // 10)
+NEC_START_DATA_MIN_US = const(NEC_START_DATA_US * 7 // 10)
+NEC_START_DATA_MAX_US = const(NEC_START_DATA_US * 13 // 10)
+NEC_START_REPEAT_MIN_US = const(NEC_START_REPEAT_US * 7 // 10)
+NEC_START_REPEAT_MAX_US = const(NEC_START_REPEAT_US * 13 // 10)
+
+# Data bits are checked on the full pulse length (burst and idle combined)
+NEC_DATA_ZERO_MIN_US = const((NEC_DATA_BURST_US + NEC_DATA_ZERO_US) * 7 // 10)
+NEC_DATA_ZERO_MAX_US = const((NEC_DATA_BURST_US + NEC_DATA_ZERO_US) * 13 // 10)
+NEC_DATA_ONE_MIN_US = const((NEC_DATA_BURST_US + NEC_DATA_ONE_US) * 7 // 10)
+NEC_DATA_ONE_MAX_US = const((NEC_DATA_BURST_US + NEC_DATA_ONE_US) * 13 // 10)
+
 
 def pulse_us_valid(us, expected_us):
     return abs(us - expected_us) < expected_us * NEC_ALLOWED_DEVIATION_PERCENT
@@ -0,0 +1,8 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from .common import LINK_MAX_PAYLOAD, crc16, build_frame, frame_pulses
+from .send import LinkSender
+from .receive import LinkReceiver
+from .datalink import DataLink
@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+# A badge to badge data link. Rather than NEC's one bit per pulse, each pulse
+# carries a two bit symbol in its full length (burst and idle combined), with
+# the shortest burst and idle a 38kHz IR receiver reliably resolves
+LINK_FREQUENCY = const(38000)
+
+LINK_START_BURST_US = const(3000)
+LINK_START_IDLE_US = const(1500)
+
+LINK_BURST_US = const(300)
+LINK_SYMBOL_STEP_US = const(300)        # Idles of 300, 600, 900 and 1200us carry symbols 0 to 3
+LINK_LOCKOUT_US = const(9500)           # Set to be longer than the time of the receiver code's lockout
+
+# Each symbol is accepted within half a step of its full pulse length
+LINK_SYMBOL_MIN_US = const(LINK_BURST_US + LINK_SYMBOL_STEP_US // 2)
+LINK_SYMBOL_MAX_US = const(LINK_SYMBOL_MIN_US + 4 * LINK_SYMBOL_STEP_US)
+
+# Exclusive integer bounds for the start pulse, as for NEC
+LINK_START_BURST_MIN_US = const(LINK_START_BURST_US * 7 // 10)
+LINK_START_BURST_MAX_US = const(LINK_START_BURST_US * 13 // 10)
+LINK_START_IDLE_MIN_US = const(LINK_START_IDLE_US * 7 // 10)
+LINK_START_IDLE_MAX_US = const(LINK_START_IDLE_US * 13 // 10)
+
+# Kept below LINK_BURST_US, so the blip filter never merges real pulses
+LINK_FILTER_THRESHOLD = const(150)
+
+# Frames are a header, the sender's node, the payload length, the payload,
+# then a CRC16 of all before it. The header holds these flags and a sequence
+LINK_ACK = const(0x80)                  # Acknowledges the frame with the same sequence
+LINK_FIRST = const(0x40)                # First frame of a message
+LINK_MORE = const(0x20)                 # More frames of the message follow
+LINK_SEQ_MASK = const(0x1f)
+
+LINK_OVERHEAD = const(5)
+LINK_MAX_PAYLOAD = const(24)            # Keeps a whole frame within the receiver's MAX_PULSES
+LINK_MAX_FRAME = const(LINK_OVERHEAD + LINK_MAX_PAYLOAD)
+LINK_SYMBOLS_PER_BYTE = const(4)
+
+
+def crc16(data, length=None, crc=0xffff):
+    # CRC-16/CCITT-FALSE of the first `length` bytes of `data`
+    if length is None:
+        length = len(data)
+    for i in range(length):
+        crc ^= data[i] << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xffff
+            else:
+                crc = (crc << 1) & 0xffff
+    return crc
+
+
+def build_frame(header, node, payload=b""):
+    """
+    Returns the bytes of a frame carrying `payload`, which must be no longer
+    than LINK_MAX_PAYLOAD.
+    """
+    if len(payload) > LINK_MAX_PAYLOAD:
+        raise ValueError(f"payload too long. Expected at most {LINK_MAX_PAYLOAD} bytes")
+
+    frame = bytearray(LINK_OVERHEAD + len(payload))
+    frame[0] = header
+    frame[1] = node
+    frame[2] = len(payload)
+    frame[3:3 + len(payload)] = payload
+    crc = crc16(frame, len(frame) - 2)
+    frame[-2] = crc >> 8
+    frame[-1] = crc & 0xff
+    return frame
+
+
+def frame_pulses(frame):
+    """
+    Returns the (burst_us, idle_us) pulses that send a frame, most
+    significant symbol first.
+    """
+    pulses = [(LINK_START_BURST_US, LINK_START_IDLE_US)]
+    for byte in frame:
+        for shift in (6, 4, 2, 0):
+            symbol = (byte >> shift) & 0b11
+            pulses.append((LINK_BURST_US, LINK_SYMBOL_STEP_US * (symbol + 1)))
+
+    # A final burst, to end the last symbol's idle
+    pulses.append((LINK_BURST_US, LINK_LOCKOUT_US))
+    return pulses
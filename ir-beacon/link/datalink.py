@@ -0,0 +1,168 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import random
+import time
+from .common import LINK_ACK, LINK_FIRST, LINK_MORE, LINK_SEQ_MASK, LINK_MAX_PAYLOAD
+from .receive import LINK_NAME
+
+# Constants
+LINK_RETRIES = const(3)
+LINK_ACK_TIMEOUT_MS = const(100)        # After the frame has been sent
+LINK_POLL_DELAY = 0.005
+MAX_MESSAGE = const(1024)
+MAX_MESSAGES = const(4)
+
+
+class DataLink:
+    """
+    Sends and receives messages of any length up to MAX_MESSAGE bytes over
+    a `LinkSender` and `LinkReceiver`, such as between two badges.
+
+    Messages are split into frames of up to LINK_MAX_PAYLOAD bytes. Each frame
+    is sent until the other end acknowledges it, up to `retries` more times,
+    before the next is sent. Frames carry a random node number, so a badge
+    ignores the reflections of its own frames.
+    """
+    def __init__(self, sender, receiver, retries=LINK_RETRIES,
+                 ack_timeout_ms=LINK_ACK_TIMEOUT_MS):
+        self.__sender = sender
+        self.__receiver = receiver
+        self.__retries = retries
+        self.__ack_timeout_ms = ack_timeout_ms
+        self.__node = random.getrandbits(8)
+
+        self.__send_seq = random.getrandbits(5)     # So a restarted badge isn't taken for a duplicate
+        self.__acked_seq = -1
+        self.__received = None         # The node and sequence of the last data frame
+        self.__partial = bytearray()
+        self.__messages = []
+        self.on_message = None
+
+        self.frames_sent = 0
+        self.retries_sent = 0
+        self.messages_sent = 0
+        self.messages_failed = 0
+        self.messages_received = 0
+        self.duplicates = 0
+
+    def start(self):
+        self.__sender.start()
+        self.__receiver.start(scheduled=True)
+
+    def stop(self):
+        self.__sender.stop()
+        self.__receiver.stop()
+
+    def stats(self):
+        """
+        Returns a dict of how many frames, retries and messages have been
+        sent and received.
+        """
+        return {
+            "frames": self.frames_sent,
+            "retries": self.retries_sent,
+            "sent": self.messages_sent,
+            "failed": self.messages_failed,
+            "received": self.messages_received,
+            "duplicates": self.duplicates,
+        }
+
+    def message(self):
+        """
+        Returns the oldest message received and not yet taken, or None. Not
+        used if an `on_message` callback is set.
+        """
+        if len(self.__messages) == 0:
+            return None
+        return self.__messages.pop(0)
+
+    def process(self):
+        """
+        Acts on any frames received, acknowledging data and collecting
+        messages. This should be called regularly, or left to `run`.
+        """
+        for protocol, header, frame in self.__receiver.events():
+            # Ignore anything that isn't from another badge's link
+            if protocol != LINK_NAME or frame[0] == self.__node:
+                continue
+
+            seq = header & LINK_SEQ_MASK
+            if header & LINK_ACK:
+                self.__acked_seq = seq
+                continue
+
+            # Acknowledge every data frame, as the last acknowledgement may have been lost
+            self.__sender.send_frame(LINK_ACK | seq, self.__node)
+            received = (frame[0], seq)
+            if received == self.__received:
+                self.duplicates += 1
+                continue
+            self.__received = received
+
+            if header & LINK_FIRST:
+                self.__partial = bytearray()
+            if len(self.__partial) + len(frame) - 2 > MAX_MESSAGE:
+                self.__partial = bytearray()
+                continue
+            self.__partial.extend(frame[2:])
+
+            if not header & LINK_MORE:
+                message = bytes(self.__partial)
+                self.__partial = bytearray()
+                self.messages_received += 1
+                if self.on_message is not None:
+                    self.on_message(message)
+                elif len(self.__messages) < MAX_MESSAGES:
+                    self.__messages.append(message)
+
+    async def run(self):
+        while True:
+            self.process()
+            await asyncio.sleep(LINK_POLL_DELAY)
+
+    async def send(self, data):
+        """
+        Sends a message, returning True once every frame of it has been
+        acknowledged, or False if a frame went unacknowledged after all its
+        retries.
+        """
+        if len(data) > MAX_MESSAGE:
+            raise ValueError(f"data too long. Expected at most {MAX_MESSAGE} bytes")
+
+        first = LINK_FIRST
+        for offset in range(0, max(len(data), 1), LINK_MAX_PAYLOAD):
+            payload = data[offset:offset + LINK_MAX_PAYLOAD]
+            more = LINK_MORE if offset + LINK_MAX_PAYLOAD < len(data) else 0
+            seq = self.__send_seq
+            self.__send_seq = (seq + 1) & LINK_SEQ_MASK
+
+            if not await self.__send_frame(first | more | seq, payload):
+                self.messages_failed += 1
+                return False
+            first = 0
+
+        self.messages_sent += 1
+        return True
+
+    async def __send_frame(self, header, payload):
+        seq = header & LINK_SEQ_MASK
+        for attempt in range(self.__retries + 1):
+            if attempt > 0:
+                self.retries_sent += 1
+
+            duration_us = self.__sender.send_frame(header, self.__node, payload)
+            self.frames_sent += 1
+
+            # Wait for the frame to go out, then for its acknowledgement
+            await asyncio.sleep(duration_us / 1000000)
+            started = time.ticks_ms()
+            while time.ticks_diff(time.ticks_ms(), started) < self.__ack_timeout_ms:
+                self.process()
+                if self.__acked_seq == seq:
+                    return True
+                await asyncio.sleep(LINK_POLL_DELAY)
+
+        return False
@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from ...pulse.receive import PulseReceiver, PULSE_MASK
+from .common import LINK_BURST_US, LINK_START_BURST_MIN_US, LINK_START_BURST_MAX_US, \
+                    LINK_START_IDLE_MIN_US, LINK_START_IDLE_MAX_US, \
+                    LINK_SYMBOL_MIN_US, LINK_SYMBOL_MAX_US, LINK_SYMBOL_STEP_US, \
+                    LINK_SYMBOLS_PER_BYTE, LINK_FILTER_THRESHOLD, \
+                    LINK_OVERHEAD, LINK_MAX_FRAME, crc16
+
+LINK_NAME = "LINK"
+
+
+class LinkReceiver(PulseReceiver):
+    """
+    Receives data link frames. Each frame that passes its length and CRC
+    checks is posted to `events` as a `("LINK", header, frame)` tuple, where
+    `frame` is a bytes of the node, length and payload.
+    """
+    # The link's 300us bursts, less the 30% tolerance allowed for NEC
+    MIN_PULSE_US = LINK_BURST_US * 7 // 10
+
+    def __init__(self, pin_num, pio, sm,
+                 debug_pin_base=None, debug_blip_pin=None):
+        self.__frame = bytearray(LINK_MAX_FRAME)
+
+        # Reasons sequences were or weren't decoded, see `counters`
+        self.__packets = 0
+        self.__invalid_starts = 0
+        self.__invalid_symbols = 0
+        self.__length_failures = 0
+        self.__crc_failures = 0
+        super().__init__(pin_num, pio, sm, debug_pin_base, debug_blip_pin)
+
+    def decode(self, filter_threshold=None, debug=False):   # with filter
+        # The adaptive threshold can rise above the link's short bursts, so
+        # a fixed threshold is used unless one is given
+        if filter_threshold is None:
+            filter_threshold = LINK_FILTER_THRESHOLD
+        super().decode(filter_threshold, debug)
+
+    def counters(self):
+        """
+        Returns the receiver's statistics, as from `PulseReceiver.counters`,
+        with the addition of:
+
+        - `packets`: frames received that passed their checks
+        - `invalid_starts`: sequences without a valid start pulse
+        - `invalid_symbols`: sequences with a pulse that was not a symbol
+        - `length_failures`: frames whose length byte did not match their symbols
+        - `crc_failures`: frames whose CRC did not match
+        """
+        counters = super().counters()
+        counters["packets"] = self.__packets
+        counters["invalid_starts"] = self.__invalid_starts
+        counters["invalid_symbols"] = self.__invalid_symbols
+        counters["length_failures"] = self.__length_failures
+        counters["crc_failures"] = self.__crc_failures
+        return counters
+
+    def __analyse(self, bursts, idles, start, length, debug=False):
+        if length == 0:
+            return False
+
+        # Is the first pulse the start of a frame?
+        burst = bursts[start]
+        idle = idles[start]
+        if not LINK_START_BURST_MIN_US < burst < LINK_START_BURST_MAX_US or \
+           not LINK_START_IDLE_MIN_US < idle < LINK_START_IDLE_MAX_US:
+            self.__invalid_starts += 1
+            if debug:
+                print(f"Invalid Start [{burst}, {idle}]")
+            return False
+
+        # The final burst's idle runs on until the timeout, so isn't received
+        symbols = length - 1
+        size = symbols // LINK_SYMBOLS_PER_BYTE
+        if symbols % LINK_SYMBOLS_PER_BYTE != 0 or size < LINK_OVERHEAD or size > LINK_MAX_FRAME:
+            self.__length_failures += 1
+            if debug:
+                print(f"Invalid Length of {symbols} symbols")
+            return False
+
+        # Read each byte from its four symbols, most significant first
+        frame = self.__frame
+        index = start
+        for i in range(size):
+            byte = 0
+            for _ in range(LINK_SYMBOLS_PER_BYTE):
+                index = (index + 1) & PULSE_MASK
+                pulse_us = bursts[index] + idles[index]
+                if not LINK_SYMBOL_MIN_US <= pulse_us < LINK_SYMBOL_MAX_US:
+                    self.__invalid_symbols += 1
+                    if debug:
+                        print(f"Invalid Symbol [{bursts[index]}, {idles[index]}] in byte {i}")
+                    return False
+                byte = (byte << 2) | ((pulse_us - LINK_SYMBOL_MIN_US) // LINK_SYMBOL_STEP_US)
+            frame[i] = byte
+
+        if frame[2] != size - LINK_OVERHEAD:
+            self.__length_failures += 1
+            if debug:
+                print(f"Length check failed: {frame[2]} != {size - LINK_OVERHEAD}")
+            return False
+
+        crc = crc16(frame, size - 2)
+        if crc != (frame[size - 2] << 8) | frame[size - 1]:
+            self.__crc_failures += 1
+            if debug:
+                print(f"CRC check failed: 0x{crc:04x} != 0x{(frame[size - 2] << 8) | frame[size - 1]:04x}")
+            return False
+
+        if debug:
+            print(f"Frame 0x{frame[0]:02x} from node 0x{frame[1]:02x} with {frame[2]} bytes received")
+
+        self.__packets += 1
+        self.post_event((LINK_NAME, frame[0], bytes(frame[1:size - 2])))
+        return True
@@ -0,0 +1,32 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+from ...pulse.send import PulseSender
+from .common import LINK_FREQUENCY, build_frame, frame_pulses
+
+
+class LinkSender(PulseSender):
+    def __init__(self, pin_num, pio, sm, debug_burst_pin=None,
+                 debug_send_pin=None, debug_wait_pin=None):
+        super().__init__(pin_num, pio, sm, LINK_FREQUENCY,
+                         debug_burst_pin, debug_send_pin, debug_wait_pin)
+
+    def send_frame(self, header, node, payload=b""):
+        """
+        Sends a frame carrying `payload`, and returns how long it takes to
+        transmit in microseconds. Like `send_words`, this returns as soon as
+        the pulses have been handed over, not once they have been sent.
+        """
+        pulses = frame_pulses(build_frame(header, node, payload))
+
+        words = array("I", bytes(4 * len(pulses)))
+        duration_us = 0
+        for i, (burst_us, idle_us) in enumerate(pulses):
+            words[i] = self.pack(burst_us, idle_us)
+            duration_us += burst_us + idle_us
+
+        # Pass the whole frame to the SM in one go
+        self.send_words(words)
+        return duration_us
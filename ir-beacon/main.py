@@ -1,20 +1,24 @@
-import time
-from aye_arr.nec import NECSender
+import asyncio
+from aye_arr.nec import NECSender, BeaconScheduler
 from pimoroni import RGBLED
 
 """
 IR Beacon for Github Universe 2025.
 
-Set COMMAND to a unique code for each device.
+Set COMMAND to a unique code for each device, or list several address and
+command pairs in CODES to have the beacon take turns sending each of them.
 """
 
 # Beacon Constants
 ADDRESS = 0x45      # Make sure this matches the address used for the event
 COMMAND = 0x66      # Make sure this matches one of the quests codes for the event
+CODES = [(ADDRESS, COMMAND)]
 BURST = 5
 BURST_DELAY = 0.01
 BURST_COLOUR = (255, 32, 255)
 SILENCE_DELAY = 1
+SILENCE_JITTER = 0.5    # Random extra silence, so nearby beacons don't keep colliding
+STATS_DELAY = 60
 
 # Board Constants
 IR_TX_PIN = 0
@@ -23,20 +27,26 @@ LED_PINS = (18, 19, 20)
 # Variables
 sender = NECSender(IR_TX_PIN, 0, 0)
 led = RGBLED(*LED_PINS)
+scheduler = BeaconScheduler(sender, CODES, BURST, BURST_DELAY,
+                            SILENCE_DELAY, SILENCE_JITTER,
+                            led, BURST_COLOUR)
+
+
+async def report():
+    while True:
+        await asyncio.sleep(STATS_DELAY)
+        print(f"Sent {scheduler.frames_sent} frames in {scheduler.bursts_sent} bursts")
+
+
+async def main():
+    asyncio.create_task(report())
+    for addr, cmd in CODES:
+        print(f"Sending Addr 0x{addr:02x}, Cmd 0x{cmd:02x}")
+    await scheduler.run()
+
 
 # Initiate the sender
 sender.start()
 
 # Loop forever
-while True:
-    # Send the intended address and command several times to help it be detected
-    print(f"Sending Addr 0x{ADDRESS:02x}, Cmd 0x{COMMAND:02x}")
-    for i in range(BURST):
-        sender.send_addr_cmd(ADDRESS, COMMAND)
-        led.set_rgb(*BURST_COLOUR)
-
-        time.sleep(BURST_DELAY)
-        led.set_rgb(0, 0, 0)
-
-    # Have a period of silence between each burst
-    time.sleep(SILENCE_DELAY)
+asyncio.run(main())
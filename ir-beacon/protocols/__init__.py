@@ -0,0 +1,12 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from .decoder import Decoder, REPEAT
+from .nec import NECDecoder
+from .samsung import SamsungDecoder
+from .sirc import SIRCDecoder
+from .rc5 import RC5Decoder
+
+# Decoders used by `UniversalReceiver` when none are given
+DEFAULT_DECODERS = (NECDecoder, SamsungDecoder, SIRCDecoder, RC5Decoder)
@@ -0,0 +1,55 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+# Returned by `Decoder.decode` when the pulses were a repeat of the last code
+REPEAT = const(-1)
+
+# Returned by `pulse_distance_bits` when a pulse did not match a bit
+INVALID = const(-1)
+
+
+def pulse_within(us, expected_us):
+    # Integer form of the 30% deviation allowed by `pulse_us_valid`
+    return expected_us * 7 < us * 10 < expected_us * 13
+
+
+def pulse_distance_bits(bursts, idles, start, count, mask, zero_us, one_us):
+    # Read `count` bits, least significant first, that are encoded by the full
+    # length (burst and idle combined) of each pulse, as used by NEC and Samsung
+    code = 0
+    for i in range(count):
+        index = (start + i) & mask
+        pulse_us = bursts[index] + idles[index]
+        if pulse_within(pulse_us, zero_us):
+            continue
+        if pulse_within(pulse_us, one_us):
+            code |= (1 << i)
+            continue
+        return INVALID
+    return code
+
+
+class Decoder:
+    """
+    Decodes the pulses of one IR protocol. Decoders do not touch any hardware,
+    so they can be run against recorded pulses as well as on a `PulseReceiver`.
+    """
+    NAME = "Unknown"
+
+    def plausible(self, burst, idle):
+        """
+        Returns whether the first pulse of a sequence could belong to this
+        protocol. This should be cheap, as it decides whether `decode` runs.
+        """
+        return False
+
+    def decode(self, bursts, idles, start, length, mask):
+        """
+        Decodes a sequence of `length` pulses, the first of which is at index
+        `start` of the `bursts` and `idles` ring buffers (indices wrap with
+        `& mask`). Returns the address and command packed as
+        `(addr << 8) | cmd`, `REPEAT` if the sequence repeats the last code,
+        or None if the pulses are not valid for this protocol.
+        """
+        return None
@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from ..common import NEC_DATA_BURST_US, NEC_DATA_ZERO_US, NEC_DATA_ONE_US, \
+                     NEC_START_BURST_MIN_US, NEC_START_BURST_MAX_US, \
+                     NEC_START_DATA_MIN_US, NEC_START_DATA_MAX_US, \
+                     NEC_START_REPEAT_MIN_US, NEC_START_REPEAT_MAX_US
+from .decoder import Decoder, REPEAT, INVALID, pulse_distance_bits
+
+
+class NECDecoder(Decoder):
+    NAME = "NEC"
+
+    def __init__(self, extended_addresses=False):
+        self.__extended = extended_addresses
+
+    def plausible(self, burst, idle):
+        return NEC_START_BURST_MIN_US < burst < NEC_START_BURST_MAX_US and \
+            (NEC_START_DATA_MIN_US < idle < NEC_START_DATA_MAX_US or
+             NEC_START_REPEAT_MIN_US < idle < NEC_START_REPEAT_MAX_US)
+
+    def decode(self, bursts, idles, start, length, mask):
+        # Is the sequence a lone repeat pulse?
+        if NEC_START_REPEAT_MIN_US < idles[start] < NEC_START_REPEAT_MAX_US:
+            return REPEAT if length == 1 else None
+
+        # Are there fewer pulses than a full code requires?
+        if length < 33:
+            return None
+
+        code = pulse_distance_bits(bursts, idles, start + 1, 32, mask,
+                                   NEC_DATA_BURST_US + NEC_DATA_ZERO_US,
+                                   NEC_DATA_BURST_US + NEC_DATA_ONE_US)
+        if code == INVALID:
+            return None
+
+        # Extract the address from the code, optionally supporting extended addresses
+        addr = code & 0xff
+        if addr != ((code >> 8) ^ 0xff) & 0xff:
+            if not self.__extended:
+                return None
+            addr |= code & 0xff00
+
+        # Extract the command from the code
+        cmd = (code >> 16) & 0xff
+        if cmd != (code >> 24) ^ 0xff:
+            return None
+
+        return (addr << 8) | cmd
@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from .decoder import Decoder, pulse_within
+
+# Philips RC5 Manchester codes 14 bits in half bit periods. A one is an idle
+# half followed by a burst half, and a zero is the reverse, so each burst and
+# idle lasts either one or two half bits
+RC5_HALF_BIT_US = const(889)
+RC5_BITS = const(14)
+RC5_HALF_BITS = const(RC5_BITS * 2)
+
+
+def half_bits(us):
+    if pulse_within(us, RC5_HALF_BIT_US):
+        return 1
+    if pulse_within(us, RC5_HALF_BIT_US * 2):
+        return 2
+    return 0
+
+
+class RC5Decoder(Decoder):
+    NAME = "RC5"
+
+    def plausible(self, burst, idle):
+        return half_bits(burst) > 0 and half_bits(idle) > 0
+
+    def decode(self, bursts, idles, start, length, mask):
+        # Mark which half bits had a burst. The first half of the first start
+        # bit is an idle, which can't be seen, so the first burst is half 1
+        levels = 0
+        half = 1
+        for i in range(length):
+            index = (start + i) & mask
+
+            count = half_bits(bursts[index])
+            if count == 0:
+                return None
+            levels |= ((1 << count) - 1) << half
+            half += count
+
+            count = half_bits(idles[index])
+            if count == 0 or half + count >= RC5_HALF_BITS:
+                return None
+            half += count
+
+        # The PIO never reports the final burst, as its idle runs on until the
+        # timeout, but where it starts gives its length. It either fills the
+        # second half of a one, so ends the frame, or covers the first half of
+        # a zero, so ends one half bit before
+        if half == RC5_HALF_BITS - 1:
+            levels |= 1 << half
+        elif half == RC5_HALF_BITS - 2 or half == RC5_HALF_BITS - 3:
+            levels |= ((1 << (RC5_HALF_BITS - 1 - half)) - 1) << half
+        else:
+            return None
+
+        # Read the bits back out of the half bits, most significant first
+        code = 0
+        for i in range(RC5_BITS):
+            pair = (levels >> (i * 2)) & 0b11
+            if pair == 0b10:            # Idle then burst
+                code = (code << 1) | 1
+            elif pair == 0b01:          # Burst then idle
+                code = code << 1
+            else:
+                return None
+
+        # The second start bit is the inverted 7th bit of the command in RC5X
+        cmd = (code & 0x3f) | ((((code >> 12) & 1) ^ 1) << 6)
+        addr = (code >> 6) & 0x1f
+        return (addr << 8) | cmd
@@ -0,0 +1,42 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from .decoder import Decoder, INVALID, pulse_within, pulse_distance_bits
+
+# Samsung uses NEC's data bits after a shorter start burst, and sends its
+# address twice rather than with an inverted copy
+SAMSUNG_START_BURST_US = const(4500)
+SAMSUNG_START_DATA_US = const(4500)
+SAMSUNG_DATA_BURST_US = const(560)
+SAMSUNG_DATA_ZERO_US = const(SAMSUNG_DATA_BURST_US)
+SAMSUNG_DATA_ONE_US = const(1690)
+
+
+class SamsungDecoder(Decoder):
+    NAME = "Samsung"
+
+    def plausible(self, burst, idle):
+        return pulse_within(burst, SAMSUNG_START_BURST_US) and \
+            pulse_within(idle, SAMSUNG_START_DATA_US)
+
+    def decode(self, bursts, idles, start, length, mask):
+        # Are there fewer pulses than a full code requires?
+        if length < 33:
+            return None
+
+        code = pulse_distance_bits(bursts, idles, start + 1, 32, mask,
+                                   SAMSUNG_DATA_BURST_US + SAMSUNG_DATA_ZERO_US,
+                                   SAMSUNG_DATA_BURST_US + SAMSUNG_DATA_ONE_US)
+        if code == INVALID:
+            return None
+
+        addr = code & 0xff
+        if addr != (code >> 8) & 0xff:
+            return None
+
+        cmd = (code >> 16) & 0xff
+        if cmd != (code >> 24) ^ 0xff:
+            return None
+
+        return (addr << 8) | cmd
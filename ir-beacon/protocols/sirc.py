@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from .decoder import Decoder, pulse_within
+
+# Sony SIRC encodes bits in the length of each burst, with a fixed idle between
+SIRC_START_BURST_US = const(2400)
+SIRC_IDLE_US = const(600)
+SIRC_ZERO_BURST_US = const(600)
+SIRC_ONE_BURST_US = const(1200)
+SIRC_COMMAND_BITS = const(7)
+
+
+class SIRCDecoder(Decoder):
+    NAME = "SIRC"
+
+    def plausible(self, burst, idle):
+        return pulse_within(burst, SIRC_START_BURST_US) and \
+            pulse_within(idle, SIRC_IDLE_US)
+
+    def decode(self, bursts, idles, start, length, mask):
+        # Codes come in 12, 15 and 20 bit versions, all with a 7 bit command.
+        # The PIO never reports the final burst, as its idle runs on until the
+        # timeout, so only the start pulse and all but the last bit are seen
+        bits = length
+        if bits != 12 and bits != 15 and bits != 20:
+            return None
+
+        code = 0
+        for i in range(bits - 1):
+            index = (start + 1 + i) & mask
+            burst = bursts[index]
+
+            if not pulse_within(idles[index], SIRC_IDLE_US):
+                return None
+
+            if pulse_within(burst, SIRC_ONE_BURST_US):
+                code |= (1 << i)
+            elif not pulse_within(burst, SIRC_ZERO_BURST_US):
+                return None
+
+        # The unseen last bit is the most significant of the address, so
+        # addresses are decoded with it always clear
+        cmd = code & ((1 << SIRC_COMMAND_BITS) - 1)
+        addr = code >> SIRC_COMMAND_BITS
+        return (addr << 8) | cmd
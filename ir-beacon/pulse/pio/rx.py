@@ -17,13 +17,13 @@ IDLE_COUNT_TIMEOUT = const((2 ** IDLE_BITS) - 1)
 TIMEOUT_REACHED = const(0xffffffff)
 
 
-# Conversion Functions
+# Conversion Functions (integer only, so converting a pulse never allocates)
 def count_to_burst_us(count):
-    return int(BURST_COUNT_TIMEOUT - (count - 5)) * 2 * 1000000 / FREQUENCY
+    return (BURST_COUNT_TIMEOUT - (count - 5)) * (2 * 1000000 // FREQUENCY)
 
 
 def count_to_idle_us(count):
-    return int(IDLE_COUNT_TIMEOUT - (count - 5)) * 2 * 1000000 / FREQUENCY
+    return (IDLE_COUNT_TIMEOUT - (count - 5)) * (2 * 1000000 // FREQUENCY)
 
 
 # Normal Program
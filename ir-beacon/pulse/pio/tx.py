@@ -12,7 +12,8 @@ CLOCKS_PER_CYCLE = const(2)
 @rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, autopull=True, pull_thresh=32, fifo_join=rp2.PIO.JOIN_TX)
 def pulsesender():
     # Pulse High (4 Cycles)
-    out(y, 16).delay(1)                     # Set the high counter
+    irq(rel(0))                             # Raise an interrupt as the last pulse has ended
+    out(y, 16)                              # Set the high counter, stalling until there is another pulse
     label("high_count_check")
     nop().side(1)                           # Set the side pin to high
     jmp(y_dec, "high_count_check").side(0)  # Decrement the high counter until it is zero,
@@ -31,7 +32,8 @@ def pulsesender():
              autopull=True, pull_thresh=32, fifo_join=rp2.PIO.JOIN_TX)
 def pulsesender_debug():
     # Pulse High (4 Cycles)
-    out(y, 16).delay(1)                     # Set the high counter
+    irq(rel(0))                             # Raise an interrupt as the last pulse has ended
+    out(y, 16)                              # Set the high counter, stalling until there is another pulse
     label("high_count_check")
     set(pins, 1).side(1)                    # Set the side pin and set pin to high
     jmp(y_dec, "high_count_check").side(0)  # Decrement the high counter until it is zero,
@@ -2,24 +2,121 @@
 #
 # SPDX-License-Identifier: MIT
 
+import micropython
 import rp2
+from array import array
 from machine import Pin
-from collections import deque  # , namedtuple
 from .pio.rx import pulsereader, pulsereader_debug, FREQUENCY, \
                     count_to_burst_us, count_to_idle_us, TIMEOUT_REACHED
-from .common import Pulse, DebugPin
+from .common import DebugPin
 
 # Constants
-MAX_BUFFER = const(1024)
+MAX_BUFFER = const(1024)        # Must be a power of two
+MAX_PULSES = const(128)         # Must be a power of two
+BUFFER_MASK = const(MAX_BUFFER - 1)
+PULSE_MASK = const(MAX_PULSES - 1)
+MAX_PULSE_US = const(0xffff)
 DEFAULT_FILTER_THRESHOLD = const(200)
 
+# Bounds and step for the adaptive filter threshold. The maximum is further
+# kept a step below each receiver's MIN_PULSE_US, so real pulses aren't merged
+MIN_FILTER_THRESHOLD = const(100)
+MAX_FILTER_THRESHOLD = const(350)
+FILTER_STEP = const(25)
+
+# The shortest burst or idle NEC sends, less its 30% tolerance
+NEC_MIN_PULSE_US = const(390)
+FILTER_WINDOW = const(16)       # Sequences between each adjustment
+FILTER_TRIAL = const(2)         # Windows an adjustment is tried for before it is judged
+FILTER_MARGIN = const(2)        # Fewer failures per window an adjustment must make to be kept
+FILTER_COOLDOWN = const(4)      # Windows to wait after an adjustment is undone
+TRACE_CHUNK = const(64)         # Count pairs buffered before writing to a trace
+MAX_BACKLOG = const(4)          # Sequences waiting to be decoded before more are dropped
+MAX_EVENTS = const(16)          # Must be a power of two
+EVENT_MASK = const(MAX_EVENTS - 1)
+
+# Stored in place of TIMEOUT_REACHED, which is too large to be held in a small int
+FRAME_END = const(-1)
+
 
 class PulseReceiver:
+    # The shortest burst or idle of a valid pulse, in microseconds. Pulses
+    # shorter than this that get past the filter are counted as `short`.
+    # Receivers of protocols with shorter pulses override this
+    MIN_PULSE_US = NEC_MIN_PULSE_US
+
     def __init__(self, pin_num, pio, sm,
                  debug_pin_base=None, debug_blip_pin=None):
-        self.__counts = deque((), MAX_BUFFER)
-        self.__sequence = []
-        self.__last_pulse = None
+        # Ring buffer of raw count pairs, written by the IRQ handler at the
+        # head and read by `decode` from the tail
+        self.__counts = array("i", bytes(4 * MAX_BUFFER))
+        self.__counts_head = 0
+        self.__counts_tail = 0
+
+        # Sequences ended in the ring buffer and taken from it. Each is only
+        # written from one side, so the IRQ handler and `decode` don't race
+        self.__frames_received = 0
+        self.__frames_taken = 0
+        self.__frames_dropped = 0
+        self.__overflows = 0
+        self.__dropping = False
+
+        # Whether the IRQ handler schedules `decode` itself, see `start`
+        self.__scheduled = False
+        self.__decode_pending = False
+        self.__decode_ref = self.__scheduled_decode     # Bound once, as the IRQ handler can't allocate
+        self.__scheduled_threshold = None
+        self.__scheduled_debug = False
+
+        # Ring buffer of decoded events, written by `post_event` and read by `events`
+        self.__events = [None] * MAX_EVENTS
+        self.__events_head = 0
+        self.__events_tail = 0
+        self.__events_dropped = 0
+
+        # Ring buffers of the pulses of the sequence being received, in microseconds
+        self.__bursts = array("H", bytes(2 * MAX_PULSES))
+        self.__idles = array("H", bytes(2 * MAX_PULSES))
+        self.__start = 0
+        self.__length = 0
+
+        # The blip filter threshold used when `decode` isn't given one, and
+        # the statistics of the current window it is adjusted from
+        self.__min_pulse_us = self.MIN_PULSE_US
+        self.__max_filter_threshold = max(min(MAX_FILTER_THRESHOLD, self.MIN_PULSE_US - FILTER_STEP),
+                                          MIN_FILTER_THRESHOLD)
+        self.__base_filter_threshold = min(DEFAULT_FILTER_THRESHOLD, self.__max_filter_threshold)
+        self.__filter_threshold = self.__base_filter_threshold
+        self.__adaptive = False
+        self.__adapting = False
+        self.__window_frames = 0
+        self.__window_failed = 0
+        self.__window_merged = 0
+        self.__window_short = 0
+
+        # Failures per window at the current threshold, as a moving average
+        # times four, and the adjustment on trial with its failures so far
+        self.__baseline = -1
+        self.__trial_step = 0
+        self.__trial_windows = 0
+        self.__trial_failed = 0
+        self.__cooldown = 0
+
+        # Totals since the receiver was created, see `counters`
+        self.__frames = 0
+        self.__failed = 0
+        self.__merged = 0
+        self.__short = 0
+
+        # The last pulse, held back by `decode` in case it needs filtering
+        self.__last_burst = 0
+        self.__last_idle = 0
+        self.__has_last = False
+
+        # Trace file that received count pairs are copied to, if recording
+        self.__trace = None
+        self.__trace_words = array("I", bytes(4 * TRACE_CHUNK))
+        self.__trace_length = 0
 
         # Set up the pin used to receive pulse signals
         pin = Pin(pin_num, Pin.IN, Pin.PULL_UP)
@@ -38,27 +135,283 @@ class PulseReceiver:
         # Set up debug pin for scoping
         self.__debug_blip_pin = DebugPin(debug_blip_pin, Pin.OUT)
 
-    def start(self):
+    def start(self, scheduled=False, filter_threshold=None, debug=False):
+        """
+        Starts receiving pulses. By default `decode` must then be called
+        regularly to act on them. If `scheduled` is True, the IRQ handler
+        instead uses `micropython.schedule` to run `decode` with the given
+        `filter_threshold` as soon as each sequence of pulses ends, so codes
+        are acted on however long the rest of the program takes to loop.
+
+        Callbacks then run from the scheduler, between any two lines of the
+        program, so apps may prefer to read the decoded codes from `events`.
+        """
+        self.__scheduled = scheduled
+        self.__scheduled_threshold = filter_threshold
+        self.__scheduled_debug = debug
+        self.__decode_pending = False
         self.__sm.irq(self.__handler)
         self.__sm.active(1)
 
     def stop(self):
         self.__sm.active(0)
         self.__sm.irq(None)
+        self.__scheduled = False
+        self.stop_recording()
+
+    def record(self, path):
+        """
+        Starts copying every count pair that `decode` or `decode_no_filter`
+        takes from the PIO to a trace file, as little endian 32 bit words
+        with the PIO's TIMEOUT_REACHED marking the end of each sequence.
+        Traces can be replayed on a computer with `tools/replay.py`.
+        """
+        self.stop_recording()
+        self.__trace = open(path, "wb")
+        self.__trace_length = 0
+
+    def stop_recording(self):
+        """
+        Writes out any buffered count pairs and closes the trace file.
+        """
+        if self.__trace is not None:
+            self.__write_trace()
+            self.__trace.close()
+            self.__trace = None
+
+    def __record(self, count_pair):
+        self.__trace_words[self.__trace_length] = TIMEOUT_REACHED if count_pair == FRAME_END else count_pair
+        self.__trace_length += 1
+        if self.__trace_length == TRACE_CHUNK:
+            self.__write_trace()
+
+    def __write_trace(self):
+        self.__trace.write(memoryview(self.__trace_words)[:self.__trace_length])
+        self.__trace_length = 0
 
     def reset(self):
-        self.__counts = deque((), MAX_BUFFER)
-        self.__sequence = []
+        self.__counts_head = 0
+        self.__counts_tail = 0
+        self.__frames_taken = self.__frames_received
+        self.__dropping = False
+        self.__start = 0
+        self.__length = 0
+        self.__has_last = False
 
     @micropython.native
     def __handler(self, sm):
-        # Copy received counts from the SM to the deque for later processing.
+        # Copy received counts from the SM to the ring buffer for later processing.
+        counts = self.__counts
+        head = self.__counts_head
+        ended = 0
         while sm.rx_fifo() > 0:
-            self.__counts.append(sm.get())
+            count_pair = sm.get()
+            end = count_pair == TIMEOUT_REACHED
+            if end:
+                count_pair = FRAME_END
+
+            # Drop whole sequences while too many are waiting to be decoded,
+            # so a slow program doesn't act on stale codes when it catches up
+            if self.__dropping or self.__frames_received + ended - self.__frames_taken >= MAX_BACKLOG:
+                self.__dropping = not end
+                if end:
+                    self.__frames_dropped += 1
+                continue
+
+            # Drop the count if the buffer is full, rather than overwriting
+            # counts that have not been decoded yet
+            next_head = (head + 1) & BUFFER_MASK
+            if next_head != self.__counts_tail:
+                counts[head] = count_pair
+                head = next_head
+                if end:
+                    ended += 1
+            else:
+                self.__overflows += 1
+        self.__counts_head = head
+
+        if ended > 0:
+            self.__frames_received += ended
+            if self.__scheduled and not self.__decode_pending:
+                self.__decode_pending = True
+                try:
+                    micropython.schedule(self.__decode_ref, None)
+                except RuntimeError:
+                    # The schedule queue is full, so try again when the next sequence ends
+                    self.__decode_pending = False
+
+    def __scheduled_decode(self, _):
+        # Cleared first, so a sequence ending during the decode schedules another
+        self.__decode_pending = False
+        self.decode(self.__scheduled_threshold, self.__scheduled_debug)
+
+    def __push(self, burst, idle):
+        # Add a pulse to the end of the sequence, dropping the oldest if it is full
+        end = (self.__start + self.__length) & PULSE_MASK
+        self.__bursts[end] = min(burst, MAX_PULSE_US)
+        self.__idles[end] = min(idle, MAX_PULSE_US)
+        if self.__length < MAX_PULSES:
+            self.__length += 1
+        else:
+            self.__start = (self.__start + 1) & PULSE_MASK
+
+    def __finish(self, debug):
+        # Analyse, and clear the pulse sequence
+        decoded = self.__analyse(self.__bursts, self.__idles, self.__start, self.__length, debug)
+        self.__start = 0
+        self.__length = 0
+
+        self.__frames += 1
+        self.__window_frames += 1
+        if not decoded:
+            self.__failed += 1
+            self.__window_failed += 1
+
+        if self.__window_frames >= FILTER_WINDOW:
+            if self.__adapting:
+                self.__adapt(debug)
+            self.__window_frames = 0
+            self.__window_failed = 0
+            self.__window_merged = 0
+            self.__window_short = 0
+
+    def __adapt(self, debug):
+        # Adjustments are tried for a few windows, and only kept if they
+        # decode more sequences than the threshold did before them
+        threshold = self.__filter_threshold
+        failed = self.__window_failed
+        base = self.__base_filter_threshold
+
+        if self.__trial_step != 0:
+            self.__trial_windows += 1
+            self.__trial_failed += failed
+            if self.__trial_windows < FILTER_TRIAL:
+                return
+
+            rate = self.__trial_failed * 4 // FILTER_TRIAL
+            if abs(threshold - base) < abs(threshold - self.__trial_step - base):
+                # Steps back toward the base are kept unless they do worse
+                keep = rate <= self.__baseline + FILTER_MARGIN * 4
+            else:
+                keep = rate + FILTER_MARGIN * 4 <= self.__baseline
+            if keep:
+                self.__baseline = rate
+            else:
+                threshold -= self.__trial_step
+                self.__cooldown = FILTER_COOLDOWN
+            self.__trial_step = 0
+        else:
+            if self.__baseline < 0:
+                self.__baseline = failed * 4
+            else:
+                self.__baseline += failed - self.__baseline // 4
+
+            step = 0
+            if self.__cooldown > 0:
+                self.__cooldown -= 1
+            elif failed * 4 >= self.__window_frames:
+                # Many sequences are failing, so try raising the threshold when
+                # short pulses got past the filter, or lowering it when the
+                # filter may be merging real pulses
+                if self.__window_short > 0:
+                    step = FILTER_STEP
+                elif self.__window_merged > 0:
+                    step = -FILTER_STEP
+            elif threshold != base:
+                # Failures are few, so try drifting back toward the base threshold
+                step = FILTER_STEP if threshold < base else -FILTER_STEP
+
+            step = min(max(threshold + step, MIN_FILTER_THRESHOLD), self.__max_filter_threshold) - threshold
+            threshold += step
+            self.__trial_step = step
+            self.__trial_windows = 0
+            self.__trial_failed = 0
+
+        if debug and threshold != self.__filter_threshold:
+            print(f"Filter threshold {self.__filter_threshold}us -> {threshold}us "
+                  f"({failed}/{self.__window_frames} failed, "
+                  f"{self.__window_short} short, {self.__window_merged} merged)")
+        self.__filter_threshold = threshold
+
+    def __analyse(self, bursts, idles, start, length, debug=False):
+        # Override this to analyse a received sequence of pulses. The sequence
+        # is `length` pulses long, with the first at index `start` of the
+        # `bursts` and `idles` ring buffers. Wrap indices with `& PULSE_MASK`.
+        # Return True if the pulses were decoded successfully
+        return False
+
+    def post_event(self, event):
+        """
+        Adds an event to the queue read by `events`, dropping it if the queue
+        is full. Receivers post a tuple starting with their protocol's name
+        for each code they decode. For NEC and the universal receiver this is
+        `(protocol, addr, cmd)`, with `cmd` of -1 for a repeat of the last code.
+        """
+        next_head = (self.__events_head + 1) & EVENT_MASK
+        if next_head == self.__events_tail:
+            self.__events_dropped += 1
+            return
+        self.__events[self.__events_head] = event
+        self.__events_head = next_head
+
+    def events(self):
+        """
+        Yields the events posted since they were last read, oldest first.
+        """
+        while self.__events_tail != self.__events_head:
+            event = self.__events[self.__events_tail]
+            self.__events[self.__events_tail] = None
+            self.__events_tail = (self.__events_tail + 1) & EVENT_MASK
+            yield event
 
-    def __analyse(self, pulses, debug=False):
-        # Override this to analyse a received sequence of pulses
-        pass
+    def filter_threshold(self):
+        """
+        Returns the blip filter threshold, in microseconds, that `decode` uses
+        when it isn't given one.
+        """
+        return self.__filter_threshold
+
+    def adapt_filter(self, enabled=True):
+        """
+        Sets whether the filter threshold `decode` uses when it isn't given
+        one adapts to the noise it sees. It starts at DEFAULT_FILTER_THRESHOLD.
+
+        When many sequences fail to decode, a step up is tried if short pulses
+        are getting past the filter, or a step down if it has been merging
+        pulses. When few fail, a step back toward the default is tried. Each
+        step is undone unless it decodes more sequences than before. The
+        threshold stays within MIN_FILTER_THRESHOLD and MAX_FILTER_THRESHOLD,
+        and a FILTER_STEP below the receiver's MIN_PULSE_US.
+        """
+        self.__adaptive = enabled
+        self.__filter_threshold = self.__base_filter_threshold
+        self.__baseline = -1
+        self.__trial_step = 0
+        self.__cooldown = 0
+
+    def counters(self):
+        """
+        Returns a dict of statistics since the receiver was created:
+
+        - `frames`: sequences of pulses analysed
+        - `failed`: sequences that did not decode
+        - `merged`: blips merged into neighbouring pulses by the filter
+        - `short`: pulses shorter than MIN_PULSE_US that were not merged
+        - `frames_dropped`: sequences dropped while the backlog was full
+        - `overflows`: count pairs dropped while the MAX_BUFFER ring buffer was full
+        - `events_dropped`: events dropped while the event queue was full
+        - `filter_threshold`: the filter threshold used when `decode` isn't given one
+        """
+        return {
+            "frames": self.__frames,
+            "failed": self.__failed,
+            "merged": self.__merged,
+            "short": self.__short,
+            "frames_dropped": self.__frames_dropped,
+            "overflows": self.__overflows,
+            "events_dropped": self.__events_dropped,
+            "filter_threshold": self.__filter_threshold,
+        }
 
     def decode_no_filter(self, debug=False):
         """
@@ -67,96 +420,118 @@ class PulseReceiver:
         indicated by the PIO program's timeout being reached, the pulses are
         passed to an overridable `__analyse` function to act on any data.
 
-        This should be called frequently from user code to avoid pulses
-        queuing up and making remote button presses feel sluggish.
+        Unless the receiver was started with `scheduled=True`, this should be
+        called frequently from user code to avoid pulses queuing up and making
+        remote button presses feel sluggish.
 
         This function lacks any filtering meaning any "blips" in
         received pulses could cause data to be discarded.
         """
 
         # Go through all counts currently stored
-        while len(self.__counts) > 0:
-            count_pair = self.__counts.popleft()   # Extract the oldest count pair
+        counts = self.__counts
+        while self.__counts_tail != self.__counts_head:
+            count_pair = counts[self.__counts_tail]     # Extract the oldest count pair
+            self.__counts_tail = (self.__counts_tail + 1) & BUFFER_MASK
+
+            if self.__trace is not None:
+                self.__record(count_pair)
 
             # Did the count timeout get reached?
-            if count_pair == TIMEOUT_REACHED:
-                # Analyse, and clear the pulse sequence
-                self.__analyse(self.__sequence, debug)
-                self.__sequence.clear()
+            if count_pair == FRAME_END:
+                self.__frames_taken += 1
+                self.__finish(debug)
                 continue        # Skip to the next pulse
 
             # Otherwise, convert the count pair into a pulse and add it to the sequence
-            pulse = Pulse(count_to_burst_us((count_pair >> 16) & 0xffff),
-                          count_to_idle_us(count_pair & 0xffff))
-            self.__sequence.append(pulse)
+            self.__push(count_to_burst_us((count_pair >> 16) & 0xffff),
+                        count_to_idle_us(count_pair & 0xffff))
 
-    def decode(self, filter_threshold=DEFAULT_FILTER_THRESHOLD, debug=False):   # with filter
+    def decode(self, filter_threshold=None, debug=False):   # with filter
         """
         Checks for any newly received pulses since the last time `decode` was
         called. Once a sufficient number of pulses has been received, as
         indicated by the PIO program's timeout being reached, the pulses are
         passed to an overridable `__analyse` function to act on any data.
 
-        This should be called frequently from user code to avoid pulses
-        queuing up and making remote button presses feel sluggish.
+        Unless the receiver was started with `scheduled=True`, this should be
+        called frequently from user code to avoid pulses queuing up and making
+        remote button presses feel sluggish.
 
         This function includes a low-pass filter to removes any "blips" in
         received pulses to recover data that may otherwise be discarded.
+
+        Unless a `filter_threshold` is given, the filter uses the threshold
+        from `filter_threshold()`, which adapts to the noise it sees once
+        `adapt_filter` has been called.
         """
 
+        self.__adapting = filter_threshold is None and self.__adaptive
+        if filter_threshold is None:
+            filter_threshold = self.__filter_threshold
+
         # Go through all counts currently stored
-        while len(self.__counts) > 0:
-            count_pair = self.__counts.popleft()   # Extract the oldest count pair
+        counts = self.__counts
+        while self.__counts_tail != self.__counts_head:
+            count_pair = counts[self.__counts_tail]     # Extract the oldest count pair
+            self.__counts_tail = (self.__counts_tail + 1) & BUFFER_MASK
+
+            if self.__trace is not None:
+                self.__record(count_pair)
 
             # Did the count timeout get reached?
-            if count_pair == TIMEOUT_REACHED:
+            if count_pair == FRAME_END:
+                self.__frames_taken += 1
                 # If there is one, add the last pulse to the pulse sequence to finish it off
-                if self.__last_pulse is not None:
-                    self.__sequence.append(self.__last_pulse)
-                    self.__last_pulse = None
+                if self.__has_last:
+                    self.__push(self.__last_burst, self.__last_idle)
+                    self.__has_last = False
 
-                # Analyse, and clear the pulse sequence
-                self.__analyse(self.__sequence, debug)
-                self.__sequence.clear()
+                self.__finish(debug)
                 continue        # Skip to the next pulse
 
             # Otherwise, convert the count pair into a pulse
-            current_pulse = Pulse(count_to_burst_us((count_pair >> 16) & 0xffff),
-                                  count_to_idle_us(count_pair & 0xffff))
+            burst = count_to_burst_us((count_pair >> 16) & 0xffff)
+            idle = count_to_idle_us(count_pair & 0xffff)
 
             # Is this the first pulse we've received in this sequence?
-            if self.__last_pulse is None:
-                self.__last_pulse = current_pulse   # Save it for later
+            if not self.__has_last:
+                self.__last_burst = burst       # Save it for later
+                self.__last_idle = idle
+                self.__has_last = True
                 continue        # Skip to the next pulse
 
-            last_burst, last_idle = self.__last_pulse   # For convenience
-
             # Was the idle of the last pulse below the filter threshold?
-            if last_idle < filter_threshold:
+            if self.__last_idle < filter_threshold:
                 self.__debug_blip_pin.on()      # Show that a blip was detected
 
                 # Filter out the blip by merging the last pulse into the burst of the current pulse, updating the last pulse
-                self.__last_pulse = Pulse(
-                    current_pulse.burst + last_burst + last_idle,
-                    current_pulse.idle      # Idle is unchanged
-                )
+                self.__last_burst = burst + self.__last_burst + self.__last_idle
+                self.__last_idle = idle         # Idle is unchanged
+                self.__merged += 1
+                self.__window_merged += 1
 
                 self.__debug_blip_pin.off()     # Show that a blip was handled
                 continue        # Skip to the next pulse
 
             # Was the burst of the current pulse below the filter threshold?
-            if current_pulse.burst < filter_threshold:
+            if burst < filter_threshold:
                 self.__debug_blip_pin.on()      # Show that a blip was detected
 
                 # Filter out the blip by merging the current pulse into the idle of the last pulse, updating the last pulse
-                self.__last_pulse = Pulse(
-                    last_burst,     # Burst is unchanged
-                    last_idle + current_pulse.burst + current_pulse.idle
-                )
+                self.__last_idle = self.__last_idle + burst + idle     # Burst is unchanged
+                self.__merged += 1
+                self.__window_merged += 1
 
                 self.__debug_blip_pin.off()     # Show that a blip was handled
                 continue        # Skip to the next pulse
 
+            # Note if the last pulse is too short to be valid, so is likely a glitch the filter let through
+            if self.__last_burst < self.__min_pulse_us or self.__last_idle < self.__min_pulse_us:
+                self.__short += 1
+                self.__window_short += 1
+
             # The last pulse is now valid, so add it to the pulse sequence, and update the last pulse
-            self.__sequence.append(self.__last_pulse)
-            self.__last_pulse = current_pulse
+            self.__push(self.__last_burst, self.__last_idle)
+            self.__last_burst = burst
+            self.__last_idle = idle
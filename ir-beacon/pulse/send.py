@@ -3,22 +3,29 @@
 # SPDX-License-Identifier: MIT
 
 from rp2 import StateMachine
-from machine import Pin, mem32
+from machine import Pin, mem32, idle as cpu_idle
 from .pio.tx import pulsesender, pulsesender_debug, CLOCKS_PER_CYCLE
 from .common import DebugPin
 
+try:
+    from rp2 import DMA
+except ImportError:
+    DMA = None
+
 
 # RP2 Register Constants
 PIO_BASE = (0x50200000,
             0x50300000,
             0x50400000)  # RP2350 Only
 
-PIO_FDEBUG_OFFSET = const(0x00000008)
-PIO_FDEBUG_TXSTALL_LSB = 24
-
 PIO_FSTAT_OFFSET = const(0x00000004)
 PIO_FSTAT_TXEMPTY_LSB = 24
 
+PIO_TXF0_OFFSET = const(0x00000010)
+
+# DMA request signals for the TX FIFO of each PIO's first state machine
+PIO_DREQ_TX0 = (0, 8)
+
 
 class PulseSender:
     def __init__(self, pin_num, pio, sm, carrier_freq,
@@ -38,15 +45,24 @@ class PulseSender:
         if sm < 0 or sm > 3:
             raise ValueError("sm out of range. Expected 0 to 3")
 
-        # Select the registers to query for checking if the PIO SM has stalled
-        if stalled_wait:
-            self.__PIO_REG = PIO_BASE[pio] | PIO_FDEBUG_OFFSET
-            self.__SM_MASK = (1 << (PIO_FDEBUG_TXSTALL_LSB + sm))
-        else:
-            self.__PIO_REG = PIO_BASE[pio] | PIO_FSTAT_OFFSET
-            self.__SM_MASK = (1 << (PIO_FSTAT_TXEMPTY_LSB + sm))
+        # The register to query for checking if the PIO SM's TX FIFO is empty
+        self.__PIO_REG = PIO_BASE[pio] | PIO_FSTAT_OFFSET
+        self.__SM_MASK = (1 << (PIO_FSTAT_TXEMPTY_LSB + sm))
+        self.__stalled_wait = stalled_wait
         self.__PIO_FREQ = carrier_freq * CLOCKS_PER_CYCLE
 
+        # The TX FIFO and its DMA request, for sending whole sequences of pulses
+        self.__TXF_REG = PIO_BASE[pio] | (PIO_TXF0_OFFSET + (sm * 4))
+        self.__DREQ = PIO_DREQ_TX0[pio] + sm
+        self.__dma = None
+        self.__words = None
+        self.__transferring = False
+
+        # Whether pulses given to the SM are still being sent. The SM raises
+        # an interrupt as each pulse ends, which clears this once no more follow
+        self.__sending = False
+        self.__pulse_sent_ref = self.__pulse_sent      # Bound once, as the IRQ handler can't allocate
+
         # Load either the regular or debug program into the chosen StateMachine
         if debug_burst_pin is None:
             self.__sm = StateMachine(sm + (pio * 4), pulsesender,
@@ -63,10 +79,27 @@ class PulseSender:
         self.__debug_wait_pin = DebugPin(debug_wait_pin, Pin.OUT)
 
     def start(self):
+        self.__sm.irq(self.__pulse_sent_ref)
         self.__sm.active(1)
 
+        # Claim a DMA channel, if the firmware supports them, to feed the
+        # TX FIFO without the CPU
+        if DMA is not None and self.__dma is None:
+            self.__dma = DMA()
+            self.__dma_ctrl = self.__dma.pack_ctrl(size=2, inc_write=False,
+                                                   treq_sel=self.__DREQ,
+                                                   irq_quiet=False)
+            self.__dma.irq(self.__transfer_done)
+
     def stop(self):
+        self.wait_for_transfer()
         self.__sm.active(0)
+        self.__sm.irq(None)
+        self.__sending = False
+
+        if self.__dma is not None:
+            self.__dma.close()
+            self.__dma = None
 
     def send(self, burst_us, idle_us):
         """
@@ -81,10 +114,69 @@ class PulseSender:
         self.__debug_send_pin.on()      # Show that the pulse is being passed to the SM
 
         # Send the burst and idle counts to the PIO program as a single 32 bit integer
+        self.__sending = True
         self.__sm.put((burst << 16) | idle)
 
         self.__debug_send_pin.off()     # Show that the SM now has the pulse
 
+    def pack(self, burst_us, idle_us):
+        """
+        Converts a pulse with a given burst and idle duration into the
+        32 bit word the PIO program accepts, for sending with `send_words`.
+        """
+        burst = self.__pulse_us_to_count(burst_us) & 0xffff
+        idle = self.__pulse_us_to_count(idle_us) & 0xffff
+        return (burst << 16) | idle
+
+    def send_words(self, words):
+        """
+        Sends a sequence of pulses, packed by `pack` into an `array('I')`.
+
+        When DMA is available this returns as soon as the transfer has
+        started, leaving the CPU free while the pulses are sent. The array
+        must not be changed until `wait_for_transfer` returns.
+        """
+
+        # Wait for any previous sequence to be passed to the SM
+        self.wait_for_transfer()
+
+        self.__debug_send_pin.on()      # Show that the pulses are being passed to the SM
+
+        self.__sending = True
+        if self.__dma is None:
+            self.__sm.put(words)
+        else:
+            self.__words = words        # Keep the array alive until the transfer is done
+            self.__transferring = True
+            self.__dma.config(read=words, write=self.__TXF_REG, count=len(words),
+                              ctrl=self.__dma_ctrl, trigger=True)
+
+        self.__debug_send_pin.off()     # Show that the SM has, or is being given, the pulses
+
+    def wait_for_transfer(self):
+        """
+        Waits for a sequence started by `send_words` to be passed to the SM.
+        Rather than spinning, this sleeps until the DMA's completion interrupt.
+        """
+        while self.__transferring:
+            cpu_idle()
+
+    def __transfer_done(self, dma):
+        self.__transferring = False
+        self.__words = None
+
+    def __pulse_sent(self, sm):
+        # Once a pulse ends with nothing left to pass to the SM, all have been sent
+        if not self.__transferring and self.__read_tx():
+            self.__sending = False
+
+    def sending(self):
+        """
+        Returns whether pulses passed to the SM are still being sent, for
+        waiting on without blocking, such as from an asyncio task.
+        """
+        return self.__sending
+
     def __pulse_us_to_count(self, us):
         return round(((us * self.__PIO_FREQ) / (CLOCKS_PER_CYCLE * 1000000)) - 2)
 
@@ -93,27 +185,26 @@ class PulseSender:
         Waits for pulses to be sent by the PIO. There are two modes,
         depending on the value provided to `stalled_wait` during initialisation:
 
-        - Wait for all data to have been emitted by the PIO (TX STALL)
-        - Wait for all data to have been passed from the FIFO to the PIO (TX EMPTY)
+        - Wait for all pulses to have been emitted by the PIO, including the final idle
+        - Wait for all pulses to have been passed from the FIFO to the PIO (TX EMPTY)
 
         The former is the most "correct" for this function's name, but adds additional
         milliseconds of delay (with NEC IR) that could be used for other tasks.
+
+        Rather than spinning, this sleeps until the interrupt the SM raises
+        as each pulse ends.
         """
 
-        # Clear the TXSTALL flag if selected, otherwise does nothing
-        self.__clear_tx()
+        # Make sure everything has been passed to the SM first
+        self.wait_for_transfer()
 
         self.__debug_wait_pin.on()      # Show that waiting has started
 
-        # Wait for either the PIO to stall or its TX FIFO to empty
-        while not self.__read_tx():
-            pass
+        # Wait for either the last pulse to end or the TX FIFO to empty
+        while self.__sending and (self.__stalled_wait or not self.__read_tx()):
+            cpu_idle()
 
         self.__debug_wait_pin.off()     # Show that waiting has finished
 
     def __read_tx(self):
         return (mem32[self.__PIO_REG] & self.__SM_MASK) > 0
-
-    def __clear_tx(self):
-        # Clear the register if it is write-to-clear like TXSTALL
-        mem32[self.__PIO_REG] = self.__SM_MASK
@@ -3,13 +3,18 @@
 # SPDX-License-Identifier: MIT
 
 import time
-from machine import Pin
+from machine import Pin, Timer
 from ..pulse.common import DebugPin
-from ..pulse.receive import PulseReceiver, DEFAULT_FILTER_THRESHOLD
-from .common import pulse_us_valid, NEC_REPEAT, NEC_REPEAT_TIMEOUT_MS, \
+from ..pulse.receive import PulseReceiver, PULSE_MASK
+from .common import NEC_REPEAT, NEC_REPEAT_TIMEOUT_MS, \
                     NEC_START_BURST_US, NEC_START_REPEAT_US, NEC_START_DATA_US, \
-                    NEC_DATA_BURST_US, NEC_DATA_ZERO_US, NEC_DATA_ONE_US
-from .remotes import KNOWN_REMOTES
+                    NEC_DATA_BURST_US, NEC_DATA_ZERO_US, NEC_DATA_ONE_US, \
+                    NEC_START_BURST_MIN_US, NEC_START_BURST_MAX_US, \
+                    NEC_START_DATA_MIN_US, NEC_START_DATA_MAX_US, \
+                    NEC_START_REPEAT_MIN_US, NEC_START_REPEAT_MAX_US, \
+                    NEC_DATA_ZERO_MIN_US, NEC_DATA_ZERO_MAX_US, \
+                    NEC_DATA_ONE_MIN_US, NEC_DATA_ONE_MAX_US
+from .remotes import known_remotes
 
 
 class NECReceiver(PulseReceiver):
@@ -18,9 +23,27 @@ class NECReceiver(PulseReceiver):
         self.__remotes = {}
         self.__last_code = NEC_REPEAT
         self.__last_rx = time.ticks_ms()
+        self.__last_addr = 0
         self.__extended = extended_addresses
         self.__repeat_callbacks = []
         self.__release_callbacks = []
+        self.__bits_status = bytearray(1)
+
+        # When scheduled, nothing calls `decode` between sequences, so a timer
+        # expires the last code instead
+        self.__scheduled = False
+        self.__debug = False
+        self.__release_timer = None
+        self.__expire_ref = self.__expire
+
+        # Reasons sequences were or weren't decoded, see `counters`
+        self.__codes = 0
+        self.__repeats = 0
+        self.__invalid_starts = 0
+        self.__invalid_data = 0
+        self.__incomplete = 0
+        self.__address_failures = 0
+        self.__command_failures = 0
         super().__init__(pin_num, pio, sm, debug_pin_base, debug_blip_pin)
 
         # Set up debug pin for scoping
@@ -35,54 +58,62 @@ class NECReceiver(PulseReceiver):
         else:
             self.__remotes[addr] = [remote_descriptor]
 
+    def start(self, scheduled=False, filter_threshold=None, debug=False):
+        self.__scheduled = scheduled
+        self.__debug = debug
+        if scheduled and self.__release_timer is None:
+            self.__release_timer = Timer()
+        super().start(scheduled, filter_threshold, debug)
+
+    def stop(self):
+        super().stop()
+        self.__scheduled = False
+        if self.__release_timer is not None:
+            self.__release_timer.deinit()
+
     def reset(self):
         self.__last_code = NEC_REPEAT
         self.__last_rx = time.ticks_ms()
         super().reset()
 
-    def __extract_code(self, pulses, debug=False):
-        while len(pulses) > 0:
-            pulse = pulses[0]
+    def __extract_code(self, bursts, idles, start, length, debug=False):
+        while length > 0:
+            burst = bursts[start]
+            idle = idles[start]
+            valid_burst = NEC_START_BURST_MIN_US < burst < NEC_START_BURST_MAX_US
 
             # Is the first pulse a repeat and are there no other pulses?
-            if pulse_us_valid(pulse.burst, NEC_START_BURST_US) and \
-               pulse_us_valid(pulse.idle, NEC_START_REPEAT_US) and \
-               len(pulses) == 1:
+            if valid_burst and \
+               NEC_START_REPEAT_MIN_US < idle < NEC_START_REPEAT_MAX_US and \
+               length == 1:
                 return NEC_REPEAT
 
             # Is the first pulse an invalid start?
-            if not pulse_us_valid(pulse.burst, NEC_START_BURST_US) and \
-               not pulse_us_valid(pulse.idle, NEC_START_DATA_US):
+            if not valid_burst and \
+               not NEC_START_DATA_MIN_US < idle < NEC_START_DATA_MAX_US:
                 self.__debug_error_pin.on()
+                self.__invalid_starts += 1
                 if debug:
-                    print(f"Invalid Start [{pulse.burst}, {pulse.idle}], Exp: {NEC_START_BURST_US} then {NEC_START_DATA_US} or {NEC_START_REPEAT_US}")
-                del pulses[0]
+                    print(f"Invalid Start [{burst}, {idle}], Exp: {NEC_START_BURST_US} then {NEC_START_DATA_US} or {NEC_START_REPEAT_US}")
+                start = (start + 1) & PULSE_MASK
+                length -= 1
                 self.__debug_error_pin.off()
                 continue        # Skip to the next pulse
 
             # Are there fewer pulses than a full code requires?
-            if len(pulses) < 33:
+            if length < 33:
+                self.__incomplete += 1
                 return None     # No code was extracted
 
             # Go through the rest of the pulses and extract the code
-            code = 0
-            for i in range(1, 33):
-                pulse = pulses[i]
-
-                # Does the full pulse length (of the burst and idle combined) match a `Zero`?
-                if pulse_us_valid(pulse.burst + pulse.idle,
-                                  NEC_DATA_BURST_US + NEC_DATA_ZERO_US):
-                    continue    # Skip to the next data pulse
-
-                # Does the full pulse length (of the burst and idle combined) match a `One`?
-                if pulse_us_valid(pulse.burst + pulse.idle,
-                                  NEC_DATA_BURST_US + NEC_DATA_ONE_US):
-                    code |= (1 << (i - 1))      # Add a 1 at the relevant bit position
-                    continue    # Skip to the next data pulse
-
+            code = self.__extract_bits(bursts, idles, start, self.__bits_status)
+            invalid = self.__bits_status[0]
+            if invalid:
                 self.__debug_error_pin.on()
+                self.__invalid_data += 1
                 if debug:
-                    print(f"Invalid Data [{pulse.burst}, {pulse.idle}], Exp {NEC_DATA_BURST_US} then {NEC_DATA_ONE_US} or {NEC_DATA_ZERO_US}")
+                    index = (start + invalid) & PULSE_MASK
+                    print(f"Invalid Data [{bursts[index]}, {idles[index]}], Exp {NEC_DATA_BURST_US} then {NEC_DATA_ONE_US} or {NEC_DATA_ZERO_US}")
                 self.__debug_error_pin.off()
                 return None     # No code was extracted
 
@@ -90,11 +121,64 @@ class NECReceiver(PulseReceiver):
 
         return None     # No code was extracted
 
+    @micropython.viper
+    def __extract_bits(self, bursts: ptr16, idles: ptr16, start: int, status: ptr8) -> uint:
+        # Classify the 32 data pulses following the start pulse. On success
+        # status[0] is 0, otherwise it is the position of the invalid pulse
+        mask = int(PULSE_MASK)
+        zero_min = int(NEC_DATA_ZERO_MIN_US)
+        zero_max = int(NEC_DATA_ZERO_MAX_US)
+        one_min = int(NEC_DATA_ONE_MIN_US)
+        one_max = int(NEC_DATA_ONE_MAX_US)
+
+        code = 0
+        for i in range(32):
+            index = (start + 1 + i) & mask
+            pulse_us = bursts[index] + idles[index]
+
+            # Does the full pulse length (of the burst and idle combined) match a `Zero`?
+            if pulse_us > zero_min and pulse_us < zero_max:
+                continue    # Skip to the next data pulse
+
+            # Does the full pulse length (of the burst and idle combined) match a `One`?
+            if pulse_us > one_min and pulse_us < one_max:
+                code |= 1 << i      # Add a 1 at the relevant bit position
+                continue    # Skip to the next data pulse
+
+            status[0] = i + 1
+            return uint(code)
+
+        status[0] = 0
+        return uint(code)
+
+    def counters(self):
+        """
+        Returns the receiver's statistics, as from `PulseReceiver.counters`,
+        with the addition of:
+
+        - `codes`: codes received that passed their checks
+        - `repeats`: repeat codes received
+        - `invalid_starts`: pulses skipped for not being a valid start pulse
+        - `invalid_data`: sequences with a data pulse that was neither a one or zero
+        - `incomplete`: sequences with too few pulses after their start for a full code
+        - `address_failures`: codes whose address did not match its inverse
+        - `command_failures`: codes whose command did not match its inverse
+        """
+        counters = super().counters()
+        counters["codes"] = self.__codes
+        counters["repeats"] = self.__repeats
+        counters["invalid_starts"] = self.__invalid_starts
+        counters["invalid_data"] = self.__invalid_data
+        counters["incomplete"] = self.__incomplete
+        counters["address_failures"] = self.__address_failures
+        counters["command_failures"] = self.__command_failures
+        return counters
+
     def decode_no_filter(self, debug=False):
         self.__check_repeat_timeout(debug)
         super().decode_no_filter(debug)
 
-    def decode(self, filter_threshold=DEFAULT_FILTER_THRESHOLD, debug=False):   # with filter
+    def decode(self, filter_threshold=None, debug=False):   # with filter
         self.__check_repeat_timeout(debug)
         super().decode(filter_threshold, debug)
 
@@ -114,24 +198,45 @@ class NECReceiver(PulseReceiver):
             self.__release_callbacks.clear()
             self.__repeat_callbacks.clear()
 
-    def __analyse(self, pulses, debug=False):
+    def __arm_release(self):
+        # Check for the last code expiring just after it is due to
+        self.__release_timer.init(mode=Timer.ONE_SHOT, period=NEC_REPEAT_TIMEOUT_MS + 1,
+                                  callback=self.__expire_ref)
+
+    def __expire(self, _):
+        # Runs from the scheduler, like the scheduled decode
+        if not self.__scheduled:
+            return
+        if time.ticks_diff(time.ticks_ms(), self.__last_rx) > NEC_REPEAT_TIMEOUT_MS:
+            self.__check_repeat_timeout(self.__debug)
+        elif self.__last_code != NEC_REPEAT:
+            # A code arrived since the timer was armed
+            self.__arm_release()
+
+    def __analyse(self, bursts, idles, start, length, debug=False):
         # Attempt to extract a code from the received pulses
-        code = self.__extract_code(pulses, debug)
+        code = self.__extract_code(bursts, idles, start, length, debug)
 
         # Was a code was extracted?
         if code is not None:
             # Record the time of this new code
             self.__last_rx = time.ticks_ms()
+            if self.__scheduled:
+                self.__arm_release()
 
             # Was the code a repeat?
             if code == NEC_REPEAT:
                 if debug and self.__last_code != NEC_REPEAT:
                     print(f"Repeat received, loading code 0x{self.__last_code:08x}")
 
+                self.__repeats += 1
+                if self.__last_code != NEC_REPEAT:
+                    self.post_event(("NEC", self.__last_addr, NEC_REPEAT))
+
                 # Perform the repeat actions of the last command, if any
                 for callback in self.__repeat_callbacks:
                     callback()
-                return
+                return True
 
             # Perform the release actions of the last command, if any
             for callback in self.__release_callbacks:
@@ -148,17 +253,23 @@ class NECReceiver(PulseReceiver):
             addr = code & 0xff          # 8 bit address
             if addr != ((code >> 8) ^ 0xff) & 0xff:
                 if not self.__extended:
+                    self.__address_failures += 1
                     if debug:
                         print(f"Address check failed: 0x{addr:02x} != 0x{((code >> 8) ^ 0xff) & 0xff:02x}")
-                    return
+                    return False
                 addr |= code & 0xff00
 
             # Extract the command from the code
             cmd = (code >> 16) & 0xff
             if cmd != (code >> 24) ^ 0xff:
+                self.__command_failures += 1
                 if debug:
                     print(f"Command check failed: 0x{cmd:02x} != 0x{(code >> 24) ^ 0xff:02x}, Addr: {addr:02x}")
-                return
+                return False
+
+            self.__codes += 1
+            self.__last_addr = addr
+            self.post_event(("NEC", addr, cmd))
 
             # Does the address match one of the bound remotes?
             if addr in self.__remotes:
@@ -171,10 +282,9 @@ class NECReceiver(PulseReceiver):
 
                     # Perform the callback only for known commands that are received
                     if remote.on_known is not None:
-                        for key, val in remote.BUTTON_CODES.items():
-                            if val == cmd:
-                                remote.on_known(key)
-                                break
+                        name = remote.name(cmd)
+                        if name is not None:
+                            remote.on_known(name)
 
                     try:
                         # Attempt to get the button associated with the command
@@ -184,10 +294,8 @@ class NECReceiver(PulseReceiver):
                         # At least one bound remote has this button
                         known = True
 
-                        if debug:
-                            for key, val in remote.BUTTON_CODES.items():
-                                if val == cmd:
-                                    print(f"'{key}' (0x{cmd:02x}) received from bound remote `{remote.NAME}` (0x{addr:02x})")
+                        if debug and remote.name(cmd) is not None:
+                            print(f"'{remote.name(cmd)}' (0x{cmd:02x}) received from bound remote `{remote.NAME}` (0x{addr:02x})")
 
                         # Perform the press action of the bound button, if present
                         if button.on_press is not None:
@@ -209,9 +317,9 @@ class NECReceiver(PulseReceiver):
                     for remote in self.__remotes[addr]:
                         print(f"Unknown command (0x{cmd:02x}) received from bound remote `{remote.NAME}` (0x{addr:02x}). ", end="")
 
-                        keys = [key for key, val in remote.BUTTON_CODES.items() if val == cmd]
-                        if len(keys) == 1:
-                            print(f"Likely '{keys[0]}'")
+                        name = remote.name(cmd)
+                        if name is not None:
+                            print(f"Likely '{name}'")
                         else:
                             print("No known command")
 
@@ -220,15 +328,18 @@ class NECReceiver(PulseReceiver):
                 print(f"Unknown code (Addr 0x{addr:02x}, Cmd 0x{cmd:02x}) received. ", end="")
 
                 known = False
-                for remote in KNOWN_REMOTES:
-                    if remote.ADDRESS == addr:
-                        print(", or " if known else "Likely from ", end="")
+                for remote, names in known_remotes(addr):
+                    print(", or " if known else "Likely from ", end="")
 
-                        known = True
-                        keys = [key for key, val in remote.BUTTON_CODES.items() if val == cmd]
-                        if len(keys) == 1:
-                            print(f"'{remote.NAME}.{keys[0]}'", end="")
-                        else:
-                            print(f"'{remote.NAME}' remote", end="")
+                    known = True
+                    name = names.get(cmd)
+                    if name is not None:
+                        print(f"'{remote.NAME}.{name}'", end="")
+                    else:
+                        print(f"'{remote.NAME}' remote", end="")
 
                 print("" if known else "No known remote")
+
+            return True
+
+        return False
@@ -2,4 +2,37 @@
 #
 # SPDX-License-Identifier: MIT
 
+from .descriptor import button_names
+
 KNOWN_REMOTES = []
+
+# KNOWN_REMOTES indexed by address, as lists of (remote, names) pairs. Rebuilt
+# on the next lookup after a remote is registered or has a code added
+_by_address = None
+
+
+def _invalidate():
+    global _by_address
+    _by_address = None
+
+
+def register(remote):
+    """
+    Adds a remote descriptor class to the known remotes, so codes received
+    from it can be identified even when it isn't bound.
+    """
+    KNOWN_REMOTES.append(remote)
+    _invalidate()
+
+
+def known_remotes(address):
+    """
+    Returns a list of (remote, names) pairs for the known remotes with the
+    given address, where names maps each button code to its name.
+    """
+    global _by_address
+    if _by_address is None:
+        _by_address = {}
+        for remote in KNOWN_REMOTES:
+            _by_address.setdefault(remote.ADDRESS, []).append((remote, button_names(remote.BUTTON_CODES)))
+    return _by_address.get(address, ())
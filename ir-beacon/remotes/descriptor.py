@@ -7,6 +7,15 @@ from collections import namedtuple
 ButtonHandler = namedtuple("ButtonHandler", ("on_press", "on_repeat", "on_release"))
 
 
+def button_names(button_codes):
+    # Reverse a remote's button codes into a code to name lookup. Where codes
+    # are shared the first name listed wins
+    names = {}
+    for name, code in button_codes.items():
+        names.setdefault(code, name)
+    return names
+
+
 class RemoteDescriptor:
     NAME = "Unknown"
     ADDRESS = 0x00
@@ -14,9 +23,33 @@ class RemoteDescriptor:
 
     def __init__(self):
         self.__buttons = {}
+        self.__names = button_names(self.BUTTON_CODES)
         self.on_known = None
         self.on_any = None
 
+    def add_code(self, name, code):
+        """
+        Adds a named button code to the remote, or changes the code of an
+        existing one, keeping the lookup used by `name` up to date.
+
+        BUTTON_CODES is shared by every instance of the remote's class, and
+        with the known remotes index, so that is rebuilt on its next lookup.
+        """
+        from . import _invalidate
+        old_code = self.BUTTON_CODES.get(name)
+        if old_code is not None and self.__names.get(old_code) == name:
+            del self.__names[old_code]
+        self.BUTTON_CODES[name] = code
+        self.__names.setdefault(code, name)
+        _invalidate()
+
+    def name(self, code):
+        """
+        Returns the name of the button with the given code, or None if the
+        remote has no button with that code.
+        """
+        return self.__names.get(code)
+
     def bind(self, name, on_press, on_repeat=True, on_release=False):
         if name not in self.BUTTON_CODES:
             raise KeyError(f"Name '{name}' is not a bindable button of the '{self.NAME}' remote")
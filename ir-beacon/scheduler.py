@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import random
+
+# Constants
+SEND_POLL_MS = const(2)
+
+
+class BeaconScheduler:
+    """
+    Repeatedly transmits one or more address and command pairs from an
+    `NECSender`, rotating to the next pair after each burst.
+
+    The silence between bursts is lengthened by a random jitter, and the
+    first burst is delayed by a random amount, so that neighbouring beacons
+    drift apart rather than colliding on every burst.
+    """
+    def __init__(self, sender, codes, burst=5, burst_delay=0.01,
+                 silence_delay=1, silence_jitter=0.5,
+                 led=None, burst_colour=(255, 255, 255)):
+        if len(codes) == 0:
+            raise ValueError("codes must contain at least one (addr, cmd) pair")
+
+        self.__sender = sender
+        self.__codes = codes
+        self.__burst = burst
+        self.__burst_delay = burst_delay
+        self.__silence_delay = silence_delay
+        self.__silence_jitter = silence_jitter
+        self.__led = led
+        self.__burst_colour = burst_colour
+
+        self.frames_sent = 0
+        self.bursts_sent = 0
+        self.code_frames = [0] * len(codes)
+
+    def stats(self):
+        """
+        Returns a dict of how many frames and bursts have been sent, and how
+        many frames have been sent of each address and command pair.
+        """
+        return {
+            "frames": self.frames_sent,
+            "bursts": self.bursts_sent,
+            "codes": {code: count for code, count in zip(self.__codes, self.code_frames)}
+        }
+
+    def __jitter(self, seconds):
+        return random.randint(0, int(seconds * 1000)) / 1000
+
+    async def run(self):
+        # Start at a random point so beacons powered up together don't line up
+        await asyncio.sleep(self.__jitter(self.__silence_delay + self.__silence_jitter))
+
+        index = 0
+        while True:
+            addr, cmd = self.__codes[index]
+
+            # Send the address and command several times to help it be detected,
+            # lighting the LED while each frame goes out
+            for _ in range(self.__burst):
+                if self.__led is not None:
+                    self.__led.set_rgb(*self.__burst_colour)
+
+                # Sending returns once the frame is handed over, so wait for
+                # it to finish without blocking other tasks
+                self.__sender.send_addr_cmd(addr, cmd)
+                while self.__sender.sending():
+                    await asyncio.sleep_ms(SEND_POLL_MS)
+
+                if self.__led is not None:
+                    self.__led.set_rgb(0, 0, 0)
+                await asyncio.sleep(self.__burst_delay)
+
+                self.frames_sent += 1
+                self.code_frames[index] += 1
+
+            self.bursts_sent += 1
+            index = (index + 1) % len(self.__codes)
+
+            # Have a period of silence between each burst
+            await asyncio.sleep(self.__silence_delay + self.__jitter(self.__silence_jitter))
@@ -2,11 +2,16 @@
 #
 # SPDX-License-Identifier: MIT
 
+from array import array
 from ..pulse.send import PulseSender
 from .common import NEC_FREQUENCY, NEC_START_BURST_US, NEC_START_DATA_US, \
                     NEC_DATA_BURST_US, NEC_DATA_ZERO_US, NEC_DATA_ONE_US, \
                     NEC_DATA_LOCKOUT_US
 
+# Constants
+FRAME_PULSES = const(34)        # Start, 32 data bits, and a final burst
+MAX_CACHED_FRAMES = const(16)
+
 
 class NECSender(PulseSender):
     def __init__(self, pin_num, pio, sm, debug_burst_pin=None,
@@ -14,6 +19,10 @@ class NECSender(PulseSender):
         super().__init__(pin_num, pio, sm, NEC_FREQUENCY,
                          debug_burst_pin, debug_send_pin, debug_wait_pin)
 
+        # Packed pulses of recently sent codes, so repeated codes (such as
+        # a beacon's) are only converted once
+        self.__frames = {}
+
     def send_remote(self, remote_type, name):
         self.send_addr_cmd(remote_type.ADDRESS, remote_type.BUTTON_CODES[name])
 
@@ -36,16 +45,27 @@ class NECSender(PulseSender):
         if code < 0 or code > 0xffffffff:
             raise ValueError("code out of range. Expected 0x00000000 to 0xffffffff")
 
-        # Send the starting condition
-        super().send(NEC_START_BURST_US, NEC_START_DATA_US)
+        frame = self.__frames.get(code)
+        if frame is None:
+            if len(self.__frames) >= MAX_CACHED_FRAMES:
+                self.__frames.clear()
+            frame = self.__build_frame(code)
+            self.__frames[code] = frame
+
+        # Pass the whole frame to the SM in one go
+        super().send_words(frame)
 
-        # Send each bit of the code
+    def __build_frame(self, code):
+        frame = array("I", bytes(4 * FRAME_PULSES))
+
+        # The starting condition
+        frame[0] = self.pack(NEC_START_BURST_US, NEC_START_DATA_US)
+
+        # Each bit of the code
         for bit in range(32):
             data_us = NEC_DATA_ONE_US if code & (1 << bit) else NEC_DATA_ZERO_US
-            super().send(NEC_DATA_BURST_US, data_us)
-
-        # Send a final burst
-        super().send(NEC_DATA_BURST_US, NEC_DATA_LOCKOUT_US)
+            frame[bit + 1] = self.pack(NEC_DATA_BURST_US, data_us)
 
-        # Wait for the last burst to be sent
-        super().wait_for_send()
+        # A final burst
+        frame[33] = self.pack(NEC_DATA_BURST_US, NEC_DATA_LOCKOUT_US)
+        return frame
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Replay recorded IR pulse traces through the receivers on a computer.
+
+Traces are recorded on the badge with `PulseReceiver.record(path)`, and hold
+the raw count pairs read from the PIO as little endian 32 bit words, with
+TIMEOUT_REACHED (0xffffffff) ending each sequence. This stubs out the
+MicroPython and rp2 modules the receivers need, feeds the count pairs through
+a fake state machine, and reports the decode rate, error rate and time spent
+decoding each frame.
+
+Noise can be added to the pulses with --jitter and --blips to experiment with
+the blip filter, and --synthetic generates NEC, Sony SIRC or Philips RC5
+frames when no trace is to hand.
+
+    python3 tools/replay.py quest.trace
+    python3 tools/replay.py quest.trace --blips 0.05 --filter-threshold 300
+    python3 tools/replay.py --synthetic 10000 --universal
+    python3 tools/replay.py --synthetic 10000 --protocol rc5
+"""
+
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sys
+import time
+import types
+from array import array
+
+IR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMEOUT_REACHED = 0xffffffff
+
+# Length of the fake blips added by --blips, in microseconds
+BLIP_US = 100
+
+
+class StubPin:
+    IN = OUT = PULL_UP = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def on(self):
+        pass
+
+    def off(self):
+        pass
+
+
+class StubTimer:
+    """Stands in for machine.Timer. Replays run faster than real time, so it never fires"""
+    ONE_SHOT = PERIODIC = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def deinit(self):
+        pass
+
+
+class StubStateMachine:
+    """Stands in for rp2.StateMachine, handing count pairs to the IRQ handler"""
+
+    def __init__(self, *args, **kwargs):
+        self.fifo = []
+        self.handler = None
+
+    def irq(self, handler=None):
+        self.handler = handler
+
+    def active(self, value=None):
+        pass
+
+    def rx_fifo(self):
+        return len(self.fifo)
+
+    def get(self):
+        return self.fifo.pop(0)
+
+    def put(self, value):
+        pass
+
+    def feed(self, count_pair):
+        self.fifo.append(count_pair)
+        self.handler(self)
+
+
+def install_stubs():
+    """Provide the MicroPython builtins and hardware modules the receivers use"""
+    builtins.const = lambda value: value
+    builtins.ptr8 = builtins.ptr16 = builtins.ptr32 = object
+    builtins.uint = int
+
+    # MicroPython's additions to time
+    time.ticks_ms = lambda: int(time.monotonic() * 1000)
+    time.ticks_diff = lambda new, old: new - old
+
+    micropython = types.ModuleType("micropython")
+    micropython.const = builtins.const
+    micropython.native = micropython.viper = lambda function: function
+    micropython.schedule = lambda function, arg: function(arg)
+    builtins.micropython = micropython
+    sys.modules["micropython"] = micropython
+
+    machine = types.ModuleType("machine")
+    machine.Pin = StubPin
+    machine.mem32 = {}
+    machine.idle = lambda: None
+    machine.Timer = StubTimer
+    sys.modules["machine"] = machine
+
+    rp2 = types.ModuleType("rp2")
+    rp2.PIO = types.SimpleNamespace(SHIFT_LEFT=0, SHIFT_RIGHT=1, JOIN_RX=2, JOIN_TX=1,
+                                    OUT_LOW=0, OUT_HIGH=1)
+    rp2.asm_pio = lambda *args, **kwargs: (lambda program: program)
+    rp2.StateMachine = StubStateMachine
+    sys.modules["rp2"] = rp2
+
+
+def import_receivers():
+    """Import the ir-beacon directory as the aye_arr.nec and aye_arr.pulse packages"""
+    install_stubs()
+
+    # On the badge pulse/ sits beside nec/ in aye_arr, so both resolve here
+    package = types.ModuleType("aye_arr")
+    package.__path__ = [IR_DIR]
+    sys.modules["aye_arr"] = package
+
+    spec = importlib.util.spec_from_file_location(
+        "aye_arr.nec", os.path.join(IR_DIR, "__init__.py"),
+        submodule_search_locations=[IR_DIR])
+    nec = importlib.util.module_from_spec(spec)
+    sys.modules["aye_arr.nec"] = nec
+    spec.loader.exec_module(nec)
+
+    # MicroPython doesn't mangle double underscore names, which the receivers
+    # rely on to override __analyse, so make the overrides visible to CPython
+    for cls in (nec.NECReceiver, nec.UniversalReceiver, nec.LinkReceiver):
+        cls._PulseReceiver__analyse = getattr(cls, f"_{cls.__name__}__analyse")
+
+    return nec, sys.modules["aye_arr.pulse.pio.rx"]
+
+
+def load_trace(path):
+    words = array("I")
+    with open(path, "rb") as f:
+        words.frombytes(f.read())
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+
+def nec_pulses():
+    addr = random.randint(0, 0xff)
+    cmd = random.randint(0, 0xff)
+    code = addr | ((addr ^ 0xff) << 8) | ((cmd | ((cmd ^ 0xff) << 8)) << 16)
+
+    pulses = [(9000, 4500)]
+    pulses += [(560, 1680 if code & (1 << bit) else 560) for bit in range(32)]
+    pulses.append((560, None))
+    return pulses
+
+
+def sirc_pulses():
+    bits = random.choice((12, 15, 20))
+    code = random.getrandbits(bits)
+
+    pulses = [(2400, 600)]
+    pulses += [(1200 if code & (1 << bit) else 600, 600) for bit in range(bits)]
+    pulses[-1] = (pulses[-1][0], None)
+    return pulses
+
+
+def rc5_pulses():
+    # Two start bits, a toggle bit, 5 address bits and 6 command bits, as the
+    # levels of each half bit, where a one is an idle half then a burst half
+    code = (0b11 << 12) | random.getrandbits(12)
+    levels = []
+    for bit in range(13, -1, -1):
+        levels += [False, True] if code & (1 << bit) else [True, False]
+
+    # Join the half bits into runs, skipping the start bit's unseen idle half
+    runs = []
+    for level in levels[1:]:
+        if runs and runs[-1][0] == level:
+            runs[-1][1] += 1
+        else:
+            runs.append([level, 1])
+
+    # A zero's idle half runs on into the gap after the frame
+    if not runs[-1][0]:
+        runs.pop()
+
+    pulses = []
+    for i in range(0, len(runs), 2):
+        idle = runs[i + 1][1] * 889 if i + 1 < len(runs) else None
+        pulses.append((runs[i][1] * 889, idle))
+    return pulses
+
+
+SYNTHETIC_PROTOCOLS = {"nec": nec_pulses, "sirc": sirc_pulses, "rc5": rc5_pulses}
+
+
+def synthetic_trace(frames, rx, protocol="nec"):
+    """Generate frames of random codes, as the PIO would report them"""
+    words = array("I")
+    for _ in range(frames):
+        for burst_us, idle_us in SYNTHETIC_PROTOCOLS[protocol]():
+            # The final burst is never seen, as its idle runs on until the PIO
+            # times out, and only TIMEOUT_REACHED is pushed
+            if idle_us is None:
+                break
+            words.append(to_count_pair(burst_us, idle_us, rx))
+        words.append(TIMEOUT_REACHED)
+    return words
+
+
+def to_us(count_pair, rx):
+    return (rx.count_to_burst_us((count_pair >> 16) & 0xffff),
+            rx.count_to_idle_us(count_pair & 0xffff))
+
+
+def to_count_pair(burst_us, idle_us, rx):
+    # The inverse of count_to_burst_us and count_to_idle_us
+    burst = min(max(rx.BURST_COUNT_TIMEOUT + 5 - burst_us, 0), 0xffff)
+    idle = min(max(rx.IDLE_COUNT_TIMEOUT + 5 - idle_us, 0), 0xffff)
+    return (burst << 16) | idle
+
+
+def add_noise(words, jitter_us, blip_rate, rx, blip_us=BLIP_US):
+    """Return a copy of the trace with jittered pulses and added blips"""
+    noisy = array("I")
+    for count_pair in words:
+        if count_pair == TIMEOUT_REACHED:
+            noisy.append(count_pair)
+            continue
+
+        burst_us, idle_us = to_us(count_pair, rx)
+        if jitter_us:
+            burst_us = max(1, burst_us + random.randint(-jitter_us, jitter_us))
+            idle_us = max(1, idle_us + random.randint(-jitter_us, jitter_us))
+
+        # Split the idle with a short burst, as a glitch in the receiver would
+        if random.random() < blip_rate and idle_us > blip_us * 3:
+            split_us = random.randint(blip_us, idle_us - blip_us * 2)
+            noisy.append(to_count_pair(burst_us, split_us, rx))
+            noisy.append(to_count_pair(blip_us, idle_us - split_us - blip_us, rx))
+        else:
+            noisy.append(to_count_pair(burst_us, idle_us, rx))
+    return noisy
+
+
+class Results:
+    def __init__(self):
+        self.frames = 0
+        self.codes = 0
+        self.repeats = 0
+        self.seconds = 0
+
+
+def make_receiver(nec, universal):
+    if universal:
+        return nec.UniversalReceiver(0, 0, 0)
+    return nec.NECReceiver(0, 0, 0)
+
+
+def replay(words, receiver, results, filter_threshold, no_filter, scheduled, debug):
+    receiver.start(scheduled, filter_threshold, debug)
+    sm = receiver._PulseReceiver__sm
+
+    for count_pair in words:
+        if count_pair != TIMEOUT_REACHED:
+            sm.feed(count_pair)
+            continue
+
+        # Decode once per sequence, as the badge would shortly after it ends
+        results.frames += 1
+        started = time.perf_counter()
+        sm.feed(count_pair)     # When scheduled, the stub schedule decodes straight away
+        if no_filter:
+            receiver.decode_no_filter(debug)
+        elif not scheduled:
+            receiver.decode(filter_threshold, debug)
+        results.seconds += time.perf_counter() - started
+
+        # Count every code decoded, whether or not it belongs to a bound remote
+        for _, _, cmd in receiver.events():
+            if cmd == -1:
+                results.repeats += 1
+            else:
+                results.codes += 1
+
+
+class LinkResults:
+    def __init__(self):
+        self.messages = 0
+        self.delivered = 0
+        self.data_frames = 0
+        self.data_lost = 0
+        self.acks = 0
+        self.acks_lost = 0
+        self.payload_bytes = 0
+        self.seconds = 0
+
+
+def transmit_frame(link, receiver, header, node, payload, rx, jitter_us, blip_rate, debug):
+    """
+    Sends one data link frame through the noise to the receiver. Returns
+    whether it arrived intact, and the microseconds it kept the channel busy.
+    """
+    pulses = link.frame_pulses(link.build_frame(header, node, payload))
+
+    # The PIO times out during the final burst's idle, rather than reporting it
+    words = array("I", (to_count_pair(burst_us, idle_us, rx) for burst_us, idle_us in pulses[:-1]))
+    words.append(TIMEOUT_REACHED)
+    if jitter_us or blip_rate:
+        words = add_noise(words, jitter_us, blip_rate, rx)
+
+    sm = receiver._PulseReceiver__sm
+    for count_pair in words:
+        sm.feed(count_pair)
+    receiver.decode(None, debug)
+
+    arrived = False
+    for _, received_header, frame in receiver.events():
+        arrived = received_header == header and frame[0] == node and frame[2:] == payload
+    return arrived, sum(burst_us + idle_us for burst_us, idle_us in pulses)
+
+
+def link_benchmark(nec, rx, messages, size, jitter_us, blip_rate, debug):
+    """
+    Sends messages with the data link's stop and wait retries, through the
+    link receiver in both directions, timing the channel as the badges
+    would use it.
+    """
+    link = nec.link
+    receiver = nec.LinkReceiver(0, 0, 0)
+    receiver.start()
+
+    retries = link.datalink.LINK_RETRIES
+    ack_timeout_us = link.datalink.LINK_ACK_TIMEOUT_MS * 1000
+    poll_us = int(link.datalink.LINK_POLL_DELAY * 1000000)
+
+    results = LinkResults()
+    seq = 0
+    for _ in range(messages):
+        data = bytes(random.getrandbits(8) for _ in range(size))
+        results.messages += 1
+
+        delivered = True
+        first = link.common.LINK_FIRST
+        for offset in range(0, max(size, 1), link.LINK_MAX_PAYLOAD):
+            payload = data[offset:offset + link.LINK_MAX_PAYLOAD]
+            more = link.common.LINK_MORE if offset + link.LINK_MAX_PAYLOAD < size else 0
+            header = first | more | seq
+            seq = (seq + 1) & link.common.LINK_SEQ_MASK
+            first = 0
+
+            for _ in range(retries + 1):
+                results.data_frames += 1
+                arrived, busy_us = transmit_frame(link, receiver, header, 1, payload,
+                                                  rx, jitter_us, blip_rate, debug)
+                results.seconds += busy_us / 1000000
+                if not arrived:
+                    results.data_lost += 1
+                    results.seconds += ack_timeout_us / 1000000
+                    continue
+
+                results.acks += 1
+                ack_header = link.common.LINK_ACK | (header & link.common.LINK_SEQ_MASK)
+                arrived, busy_us = transmit_frame(link, receiver, ack_header, 2, b"",
+                                                  rx, jitter_us, blip_rate, debug)
+                if not arrived:
+                    results.acks_lost += 1
+                    results.seconds += ack_timeout_us / 1000000
+                    continue
+
+                # Each end polls for received frames before replying
+                results.seconds += (busy_us + poll_us * 2) / 1000000
+                break
+            else:
+                delivered = False
+                break
+
+        if delivered:
+            results.delivered += 1
+            results.payload_bytes += size
+
+    return receiver, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay IR pulse traces through the receivers")
+    parser.add_argument("traces", nargs="*", help="trace files recorded with PulseReceiver.record()")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="FRAMES",
+                        help="also replay this many generated frames")
+    parser.add_argument("--protocol", choices=sorted(SYNTHETIC_PROTOCOLS), default="nec",
+                        help="protocol of the generated frames, decoded with UniversalReceiver unless nec")
+    parser.add_argument("--universal", action="store_true",
+                        help="decode with UniversalReceiver rather than NECReceiver")
+    parser.add_argument("--no-filter", action="store_true",
+                        help="use decode_no_filter() rather than decode()")
+    parser.add_argument("--link", type=int, default=0, metavar="MESSAGES",
+                        help="benchmark the data link by sending this many messages")
+    parser.add_argument("--link-size", type=int, default=64, metavar="BYTES",
+                        help="size of each data link message")
+    parser.add_argument("--scheduled", action="store_true",
+                        help="start the receiver with scheduled=True, decoding from the IRQ handler")
+    parser.add_argument("--filter-threshold", type=int, default=None,
+                        help="fixed blip filter threshold in microseconds, rather than the receiver's own")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="let the receiver's filter threshold adapt to the noise, with adapt_filter()")
+    parser.add_argument("--jitter", type=int, default=0, metavar="US",
+                        help="randomly lengthen or shorten each burst and idle by up to this")
+    parser.add_argument("--blips", type=float, default=0, metavar="RATE",
+                        help="fraction of pulses to split with a short blip")
+    parser.add_argument("--blip-us", type=int, default=BLIP_US, metavar="US",
+                        help="length of each blip")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the noise")
+    parser.add_argument("--counters", action="store_true", help="print the receiver's counters")
+    parser.add_argument("--debug", action="store_true", help="print the receiver's debug output")
+    args = parser.parse_args()
+
+    if not args.traces and not args.synthetic and not args.link:
+        parser.error("give at least one trace, --synthetic or --link")
+
+    if args.protocol != "nec":
+        args.universal = True
+
+    random.seed(args.seed)
+    nec, rx = import_receivers()
+
+    if args.link:
+        with contextlib.redirect_stdout(sys.stdout if args.debug else io.StringIO()):
+            receiver, results = link_benchmark(nec, rx, args.link, args.link_size,
+                                               args.jitter, args.blips, args.debug)
+
+        data_frames = max(results.data_frames, 1)
+        acks = max(results.acks, 1)
+        print(f"{results.messages} data link messages of {args.link_size} bytes: "
+              f"{results.delivered} delivered ({results.delivered * 100 / max(results.messages, 1):.1f}%), "
+              f"{results.data_frames} data frames ({results.data_lost * 100 / data_frames:.1f}% lost), "
+              f"{results.acks} acks ({results.acks_lost * 100 / acks:.1f}% lost), "
+              f"{results.payload_bytes / max(results.seconds, 1e-9):.1f} bytes per second")
+        if args.counters:
+            for key, value in receiver.counters().items():
+                print(f"    {key}: {value}")
+    sources = [(path, load_trace(path)) for path in args.traces]
+    if args.synthetic:
+        sources.append((f"{args.synthetic} synthetic {args.protocol.upper()} frames",
+                        synthetic_trace(args.synthetic, rx, args.protocol)))
+
+    for name, words in sources:
+        if args.jitter or args.blips:
+            words = add_noise(words, args.jitter, args.blips, rx, args.blip_us)
+
+        results = Results()
+        receiver = make_receiver(nec, args.universal)
+        receiver.adapt_filter(args.adaptive)
+
+        # Hide the receivers' reports of unknown codes, unless debugging
+        with contextlib.redirect_stdout(sys.stdout if args.debug else io.StringIO()):
+            replay(words, receiver, results, args.filter_threshold, args.no_filter,
+                   args.scheduled, args.debug)
+
+        frames = max(results.frames, 1)
+        errors = results.frames - results.codes - results.repeats
+        print(f"{name}: {results.frames} frames, "
+              f"{results.codes} codes ({results.codes * 100 / frames:.1f}%), "
+              f"{results.repeats} repeats, "
+              f"{errors} errors ({errors * 100 / frames:.1f}%), "
+              f"{results.seconds * 1000000 / frames:.1f} us per frame, "
+              f"filter threshold {receiver.filter_threshold() if args.filter_threshold is None else args.filter_threshold} us")
+        if args.counters:
+            for key, value in receiver.counters().items():
+                print(f"    {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
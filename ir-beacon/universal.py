@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2025 Christopher Parrott for Pimoroni Ltd
+#
+# SPDX-License-Identifier: MIT
+
+from ..pulse.receive import PulseReceiver, PULSE_MASK
+from .protocols import DEFAULT_DECODERS, REPEAT
+
+
+class UniversalReceiver(PulseReceiver):
+    """
+    Receives codes from any of several IR protocols on a single PIO state
+    machine. Each received sequence is offered to the decoders whose
+    `plausible` check passes on its first pulse, in the order they were added,
+    until one of them decodes it.
+    """
+    def __init__(self, pin_num, pio, sm, decoders=None,
+                 debug_pin_base=None, debug_blip_pin=None):
+        self.__decoders = []
+        self.__last_decoder = None
+        self.__last_addr = 0
+        self.__codes = 0
+        self.__repeats = 0
+        self.on_code = None
+        self.on_repeat = None
+        super().__init__(pin_num, pio, sm, debug_pin_base, debug_blip_pin)
+
+        for decoder in DEFAULT_DECODERS if decoders is None else decoders:
+            self.add_decoder(decoder())
+
+    def add_decoder(self, decoder):
+        """
+        Adds a `Decoder` instance to try on received pulses, after any
+        decoders already added.
+        """
+        self.__decoders.append(decoder)
+
+    def counters(self):
+        """
+        Returns the receiver's statistics, as from `PulseReceiver.counters`,
+        with the addition of the `codes` and `repeats` decoded.
+        """
+        counters = super().counters()
+        counters["codes"] = self.__codes
+        counters["repeats"] = self.__repeats
+        return counters
+
+    def __analyse(self, bursts, idles, start, length, debug=False):
+        if length == 0:
+            return False
+
+        burst = bursts[start]
+        idle = idles[start]
+        for decoder in self.__decoders:
+            # Only run the full decode for protocols the first pulse could belong to
+            if not decoder.plausible(burst, idle):
+                continue
+
+            result = decoder.decode(bursts, idles, start, length, PULSE_MASK)
+            if result is None:
+                continue
+
+            if result == REPEAT:
+                # Only repeat codes from the protocol that sent the last one
+                if decoder is self.__last_decoder:
+                    self.__repeats += 1
+                    self.post_event((decoder.NAME, self.__last_addr, REPEAT))
+                    if self.on_repeat is not None:
+                        self.on_repeat(decoder.NAME)
+                return True
+
+            addr = result >> 8
+            cmd = result & 0xff
+            if debug:
+                print(f"{decoder.NAME} code (Addr 0x{addr:02x}, Cmd 0x{cmd:02x}) received")
+
+            self.__codes += 1
+            self.__last_decoder = decoder
+            self.__last_addr = addr
+            self.post_event((decoder.NAME, addr, cmd))
+            if self.on_code is not None:
+                self.on_code(decoder.NAME, addr, cmd)
+            return True
+
+        if debug:
+            print(f"Unknown pulses [{burst}, {idle}] x{length} received")
+        return False